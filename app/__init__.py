@@ -8,9 +8,10 @@ from flask_cors import CORS
 from flask.logging import default_handler
 import app.filters as filters_util
 import logging
-from app.models import Distributor, Agent
-from app.extensions import db, jwt
+from app.models import Distributor, Agent, ACCOUNT_MODELS_BY_ROLE, STAFF_ROLES, TokenRevocation
+from app.extensions import db, jwt, cache, hashing_pool, identity_cache, revocations, delivery_queue, signing_keys, replicas, unit_of_work, query_stats
 from .services.cloudinary_service import CloudinaryService
+from .services.pool_service import pool_options
 
 
 migrate = Migrate()
@@ -25,10 +26,25 @@ def create_app(config_class=Config):
     Api(application)
     application.config.from_object(config_class)
 
+    # Pool sizing, recycle and pre-ping from the DB_POOL_* settings
+    application.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', pool_options(application.config))
     db.init_app(application)
+    # Engines for DB_REPLICA_URIS, read by db.session in GET requests
+    replicas.init_app(application)
+    # Model saves flush; each request commits once when it succeeds
+    unit_of_work.init_app(application, db)
+    # Per-request statement counts and timings, N+1 detection
+    query_stats.init_app(application)
     ma.init_app(application)
     jwt.init_app(application)
+    signing_keys.init_app(application, jwt)
     migrate.init_app(application, db)
+    cache.init_app(application)
+    hashing_pool.init_app(application)
+    # jwt user loader, behind a per-process cache of resolved accounts
+    identity_cache.init_app(application, jwt, ACCOUNT_MODELS_BY_ROLE, STAFF_ROLES)
+    revocations.init_app(application, jwt, TokenRevocation)
+    delivery_queue.init_app(application)
 
     # Initialize the CloudinaryService
     cloudinary_service = CloudinaryService()
@@ -54,22 +70,6 @@ def create_app(config_class=Config):
     from app.middlewares import errors_bp
     application.register_blueprint(errors_bp)
 
-    # class AgentSchema(ma.SQLAlchemyAutoSchema):
-    #     class Meta:
-    #         model = Agent
-    #         load_instance = True
-
-    # #jwt user loader
-    # @jwt.user_lookup_loader
-    # def user_lookup_callback(_jwt_headers, jwt_data):
-
-    #     identity = jwt_data['sub']
-    #     if identity['role'] is None:
-    #         identity_instance = Agent.query.filter_by(email = identity['email']).one_or_none()
-    #         details = AgentSchema().dump(identity_instance)
-    #         return details
-    #     return Distributor.query.filter_by(email = identity['email']).one_or_none()
-
     CORS(application, resources={r"/*": {"origins": "*"}})
 
     application.logger.setLevel('INFO') # Configurable log level
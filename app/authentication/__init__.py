@@ -2,4 +2,4 @@ from flask import Blueprint
 
 bp = Blueprint('authentication', __name__)
 
-from app.authentication import authentication_service, authentication_routes
+from app.authentication import authentication_service, authentication_routes, authentication_commands
@@ -0,0 +1,40 @@
+#
+# CLI: flask authentication <command>
+#
+import click
+from flask_jwt_extended import create_access_token
+
+from app.authentication import bp
+from app.models import TokenRevocation, STAFF_ROLES
+from app.extensions import signing_keys
+
+
+#
+# Delete revocations whose tokens have all expired
+#
+@bp.cli.command('prune-revocations')
+def prune_revocations():
+    deleted = TokenRevocation.prune()
+    click.echo(f"{deleted} expired revocations deleted.")
+
+
+#
+# Add a new JWT signing key; workers sign with it once they reload their keys
+#
+@bp.cli.command('rotate-signing-key')
+def rotate_signing_key():
+    if not signing_keys.enabled:
+        raise click.ClickException("JWT_ALGORITHM must be RS256 or EdDSA to use signing keys.")
+
+    kid = signing_keys.rotate()
+    click.echo(f"Signing key {kid} written to {signing_keys.directory}.")
+
+
+#
+# Print an access token for a staff role, e.g. for finance exports or the admin endpoints
+#
+@bp.cli.command('issue-token')
+@click.argument('email')
+@click.option('--role', type=click.Choice(STAFF_ROLES), required=True)
+def issue_token(email, role):
+    click.echo(create_access_token({"email": email, "role": role}))
@@ -9,10 +9,12 @@ from flask import jsonify
 from app import auth
 from app.authentication import authentication_service as auth_service
 from app.user import user_service
+from app.extensions import signing_keys
 from flask import request, url_for, current_app, jsonify, abort
 from marshmallow import ValidationError
-from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
-from app.schemas import ProfileSchema, AgentRegistrationSchema, AgentLoginSchema, AgentOtpSchema, DistributorRegistrationSchema, InsuranceCompanyRegistrationSchema
+from werkzeug.exceptions import HTTPException
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, current_user
+from app.schemas import ProfileSchema, AgentRegistrationSchema, AgentLoginSchema, AgentOtpSchema, AgentOtpVerificationSchema, DistributorRegistrationSchema, InsuranceCompanyRegistrationSchema
 #
 # Generate a new API token
 #
@@ -36,6 +38,40 @@ def get_new_access_token():
     return jsonify({'accessToken': access_token, 'success': True})
 
 
+#
+# Public keys that verify the tokens of this service (JWKS)
+#
+@bp.get('/.well-known/jwks.json')
+def get_jwks():
+    if not signing_keys.enabled:
+        abort(404, description="Tokens are signed with a shared secret, there are no public keys.")
+
+    response = jsonify(signing_keys.jwks())
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
+
+
+#
+# Logout: revoke the access or refresh token sent with the request
+#
+@bp.post('/auth/logout')
+@jwt_required(verify_type=False)
+def logout_user():
+    auth_service.logoutUser(get_jwt())
+    return jsonify({"success": True, "message": "Logged out successfully!"}), 200
+
+
+#
+# Sign out of every session: revoke all tokens issued to the account so far
+#
+@bp.post('/auth/logout-all')
+@jwt_required()
+def logout_all_sessions():
+    auth_service.revokeAllSessions(get_jwt())
+    return jsonify({"success": True, "message": "All sessions revoked successfully!"}), 200
+
+
 #
 # Register a new distributor
 #
@@ -102,6 +138,25 @@ def send_otp():
         return jsonify({"errors": err.messages, "success": False}), 400
 
 
+#
+# Verify the code sent by send_otp
+#
+@bp.post('/auth/verify_otp')
+def verify_otp():
+    try:
+        userinfo = request.get_json()
+
+        # Verify Email and code
+        otp = AgentOtpVerificationSchema().load(userinfo)
+        user_data = auth_service.verifyOtp(otp['email'], otp['otp'])
+
+        return jsonify({"data": user_data, "success": True, "message": "Verification Successful!"}), 200
+
+    except ValidationError as err:
+        current_app.logger.info(err.messages)
+        return jsonify({"errors": err.messages, "success": False}), 400
+
+
 #
 # Register a new agent
 #
@@ -204,6 +259,10 @@ def register_insurance_company():
         current_app.logger.info(err.messages)
         return jsonify({"errors": err.messages, "success": False}), 400
 
+    except HTTPException:
+        # Deliberate error responses, e.g. 503 when the hashing pool is full
+        raise
+
     except Exception as e:
         # Handle any unexpected errors
         current_app.logger.error(f"Error during registration: {str(e)}")
@@ -1,36 +1,85 @@
 from flask import g, current_app, request, jsonify
 # from app import auth
-from app.models import Agent
+from app.models import Agent, Distributor, InsuranceCompany, AccountDirectory, OneTimePassword
 from itsdangerous import (
     URLSafeTimedSerializer as Serializer,
     BadSignature,
     SignatureExpired,
 )
-from app.schemas import AgentSchema, InsuranceCompanySchema, DistributorSchema
+from app.schemas import AgentSchema, InsuranceCompanySchema, DistributorSchema, AgentRegistrationSchema, DistributorRegistrationSchema, InsuranceCompanyRegistrationSchema
+from app.uniqueness import save_unique
 from app.models import Agent
 from flask_jwt_extended import create_access_token, create_refresh_token
+from marshmallow import ValidationError
+from app.extensions import db, revocations, delivery_queue, unit_of_work
+from app.passwords import generate_otp
 
 
+# 
+# Send a verification code
+# 
+# The code is stored hashed and handed to the delivery queue once the request
+# has committed; the provider is called from a background worker, never from
+# the request.
+# 
 def sendOtp(email):
     
     user_info = Agent.query.filter_by(email=email).first()
     user_schema = AgentSchema()
     user_data = user_schema.dump(user_info)
 
+    lifetime = current_app.config['OTP_LIFETIME']
+    code = generate_otp()
+    # Sent after the commit, where a full queue could no longer fail the request
+    delivery_queue.ensure_capacity()
+    OneTimePassword.issue(email, code, lifetime)
+
+    # Only send a code that was actually stored
+    unit_of_work.after_commit(lambda: delivery_queue.enqueue(
+        email,
+        "Your verification code",
+        f"Your verification code is {code}. It expires in {int(lifetime.total_seconds() // 60)} minutes.",
+    ))
+
     access_token = create_access_token({"email": email, "role": user_data.get('account_type')})
     refresh_token = create_refresh_token(email)
     return {"accessToken": access_token, "user": user_data, "refreshToken": refresh_token}
 
+# 
+# Check a verification code and mark the agent as verified
+# 
+def verifyOtp(email, code):
+
+    otp = db.session.get(OneTimePassword, email)
+
+    if not otp or otp.is_expired() or otp.attempts >= current_app.config['OTP_MAX_ATTEMPTS']:
+        raise ValidationError({"otp": "Invalid or expired code"})
+
+    if not otp.verify(code):
+        otp.attempts += 1
+        otp.save()
+        # The request fails, which would roll the failed attempt back
+        db.session.commit()
+        raise ValidationError({"otp": "Invalid or expired code"})
+
+    otp.delete()
+
+    user_info = Agent.get_user_by_email(email)
+    if user_info:
+        user_info.otp_verified = True
+        user_info.save()
+
+    return {"email": email, "otp_verified": True}
+
+
 # 
 # Register an Agent
 # 
 def registerUser(user, password):
-    user.id = None
-
     # Encrypt password
     user.set_password(password)
 
-    user.save()
+    save_unique(user, AgentRegistrationSchema.UNIQUE_RULES)
 
     user_schema = AgentSchema()
     user_data = user_schema.dump(user)
@@ -44,12 +93,10 @@ def registerUser(user, password):
 # Register a distributor
 # 
 def registerDistributor(distributor, password):
-    distributor.id = None
-
     # Encrypt password
     distributor.set_password(password)
 
-    distributor.save()
+    save_unique(distributor, DistributorRegistrationSchema.UNIQUE_RULES)
 
     distributor_schema = DistributorSchema()
     distributor_data = distributor_schema.dump(distributor)
@@ -61,12 +108,10 @@ def registerDistributor(distributor, password):
 # Register an innsurance company
 # 
 def registerInsuranceCompany(insurance_company, password):
-    insurance_company.id = None
-
     # Encrypt password
     insurance_company.set_password(password)
 
-    insurance_company.save()
+    save_unique(insurance_company, InsuranceCompanyRegistrationSchema.UNIQUE_RULES)
 
     insurance_schema = InsuranceCompanySchema()
     insurance_data = insurance_schema.dump(insurance_company)
@@ -76,14 +121,35 @@ def registerInsuranceCompany(insurance_company, password):
 
 
 # 
-# Login agent
+# Login an agent, distributor or insurance company
+# 
+# The account directory resolves the email to its table in one primary key
+# lookup; the account row is then loaded once, the password verified once and
+# the tokens issued from that row. Hashes made with an outdated method or cost
+# are replaced while the plain password is at hand.
 # 
 
-def loginUser(user):
-    
-    user_email = user.get('email')
-    user_info = Agent.query.filter_by(email=user_email).first()
-    user_schema = AgentSchema()
+ACCOUNT_SCHEMAS = {
+    Agent: AgentSchema,
+    Distributor: DistributorSchema,
+    InsuranceCompany: InsuranceCompanySchema,
+}
+
+def loginUser(credentials):
+
+    user_info = AccountDirectory.get_account(credentials.get('email'))
+
+    if not user_info:
+        raise ValidationError({"email": "Invalid email or password"})
+
+    if not user_info.verify_password(credentials.get('password')):
+        raise ValidationError({"password": "Invalid email or password"})
+
+    if user_info.password_needs_rehash():
+        user_info.set_password(credentials.get('password'))
+        user_info.save()
+
+    user_schema = ACCOUNT_SCHEMAS[type(user_info)]()
     user_data = user_schema.dump(user_info)
 
     access_token, refresh_token = generate_auth_token(user_data)
@@ -91,6 +157,22 @@ def loginUser(user):
     return {"accessToken": access_token, "user": user_data, "refreshToken": refresh_token}
 
 
+#
+# Logout: revoke the token the request was made with
+#
+def logoutUser(jwt_payload):
+    revocations.revoke(jwt_payload)
+
+
+#
+# Revoke every access and refresh token issued to an account so far
+#
+def revokeAllSessions(jwt_payload):
+    identity = jwt_payload['sub']
+    lifetime = max(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'], current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+    revocations.revoke_all(identity['email'] if isinstance(identity, dict) else identity, lifetime, jwt_payload)
+
+
 #
 # Generates a new authentication token.
 #
@@ -1,15 +1,32 @@
-from flask_jwt_extended import get_jwt
-from flask import jsonify
+from functools import wraps
+
+from flask import abort
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from app.models import ADMIN_ROLE
+
+
+def role_required(*roles):
+    """
+    Decorator to only let tokens with one of `roles` through; the admin role passes every check.
+
+    Answers 401 without a valid token and 403 for any other role.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            identity = get_jwt_identity()
+            role = identity.get('role') if isinstance(identity, dict) else None
+            if role != ADMIN_ROLE and role not in roles:
+                abort(403, description="You do not have permission to access this resource")
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
 
 def is_admin(fn):
     """
     Decorator to check if the current user is an admin.
     """
-    def wrapper(*args, **kwargs):
-        # Get the claims from the current JWT token
-        claims = get_jwt()
-        # Check if the user has 'role' claim as 'admin'
-        if claims.get("role") != "admin":
-            return jsonify(message="You do not have permission to access this resource"), 403
-        return fn(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return role_required()(fn)
@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+
+
+#
+# Version of a row, or of the whole table when id is None: the latest
+# `updated` time of it and of the rows its `related` relationships embed,
+# and the number of rows joined, so inserts, updates and deletes of any of
+# them change it. Read without loading the rows.
+#
+def resource_version(model, id=None, related=()):
+    statement = select(func.max(model.updated), func.count()).select_from(model)
+
+    for relationship in related:
+        target = aliased(relationship.property.mapper.class_)
+        statement = statement.outerjoin(relationship.of_type(target)).add_columns(func.max(target.updated))
+
+    if id is not None:
+        statement = statement.where(model.id == id)
+
+    updated, count, *related_updated = db.session.execute(statement).one()
+    if updated is None:
+        return None, count
+    return max([updated, *(value for value in related_updated if value is not None)]), count
+
+
+#
+# Conditional GET driven by the Timestamp `updated` column.
+#
+# The ETag and Last-Modified of the resource are computed from `updated` and
+# the row count alone (see resource_version). A matching If-None-Match, or
+# failing that If-Modified-Since, is answered with 304 before the view runs, so
+# the row is neither loaded nor serialized. Last-Modified is left out while
+# writes may still land in the second of `updated`.
+#
+# id_arg names the view argument holding the primary key; leave it out for
+# collection endpoints. related lists the relationships the response embeds
+# (e.g. Purchase.agent), so changing those rows changes the version too.
+#
+def conditional_get(model, id_arg=None, related=()):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            updated, count = resource_version(model, kwargs[id_arg] if id_arg else None, related)
+
+            if updated is None:
+                # Missing row or empty table: let the view answer as usual
+                return view(*args, **kwargs)
+
+            etag = hashlib.sha1(
+                f"{model.__tablename__}:{kwargs.get(id_arg, '')}:{updated.isoformat()}:{count}:{request.query_string.decode()}".encode()
+            ).hexdigest()
+            last_modified = updated.replace(tzinfo=timezone.utc, microsecond=0)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = request.if_modified_since is not None and last_modified <= request.if_modified_since
+
+            response = make_response('', 304) if not_modified else make_response(view(*args, **kwargs))
+
+            response.set_etag(etag, weak=True)
+            # Last-Modified has whole seconds: only send it once its second is over, so
+            # no later write can share it and be answered with 304 (Timestamp is utcnow)
+            if updated.replace(microsecond=0) + timedelta(seconds=1) <= datetime.utcnow():
+                response.last_modified = last_modified
+            return response
+
+        return wrapper
+
+    return decorator
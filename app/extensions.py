@@ -1,5 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from app.services.cache_service import ResponseCache
+from app.services.hashing_service import HashingPool
+from app.services.identity_service import IdentityCache
+from app.services.revocation_service import RevocationList
+from app.services.delivery_service import DeliveryQueue
+from app.services.signing_service import SigningKeys
+from app.services.replica_service import ReplicaRouter, RoutingSession
+from app.services.transaction_service import UnitOfWork
+from app.services.sql_service import QueryStats
 
-db = SQLAlchemy()
-jwt = JWTManager()
\ No newline at end of file
+# Reads of GET requests may go to a replica, see ReplicaRouter
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = JWTManager()
+cache = ResponseCache()
+hashing_pool = HashingPool()
+identity_cache = IdentityCache()
+revocations = RevocationList()
+delivery_queue = DeliveryQueue()
+signing_keys = SigningKeys()
+replicas = ReplicaRouter()
+unit_of_work = UnitOfWork()
+query_stats = QueryStats()
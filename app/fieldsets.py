@@ -0,0 +1,103 @@
+from functools import lru_cache
+
+from flask import abort
+from marshmallow import fields
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+
+#
+# Names of the fields a schema dumps, in output order.
+#
+@lru_cache(maxsize=None)
+def schema_fields(schema_class):
+    return tuple(schema_class().dump_fields)
+
+
+#
+# Read a "fields=a,b,c" query parameter against the fields a schema dumps.
+#
+# Returns the requested names as a tuple, or None when every field is wanted.
+#
+def parse_fields(value, schema_class):
+    if value is None:
+        return None
+
+    names = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    available = schema_fields(schema_class)
+    unknown = [name for name in names if name not in available]
+
+    if not names or unknown:
+        abort(400, description="fields must be a comma separated list of: " + ", ".join(available))
+
+    return names
+
+
+#
+# Loader options fetching only the columns behind the requested fields.
+#
+# Primary keys and the columns in `required` (sort keys, ...) are always loaded;
+# requested relationships are eager loaded, joined for many-to-one and
+# select-in for collections. `default` is used when every field is wanted.
+# With the `schema` that dumps the rows, relationships are eager loaded as
+# deep as its nested fields go (see eager_loads), whether or not `only` is set.
+#
+def loader_options(model, only, required=(), default=(), schema=None):
+    if only is None:
+        return [*default, *eager_loads(model, schema)] if schema else list(default)
+
+    mapper = inspect(model)
+    primary_key = [mapper.get_property_by_column(column).class_attribute for column in mapper.primary_key]
+    columns = [mapper.column_attrs[name].class_attribute for name in only if name in mapper.column_attrs]
+
+    options = [load_only(*primary_key, *required, *columns)]
+
+    if schema is not None:
+        return options + list(eager_loads(model, schema, only))
+
+    for name in only:
+        if name in mapper.relationships:
+            relationship = mapper.relationships[name]
+            loader = selectinload if relationship.uselist else joinedload
+            options.append(loader(relationship.class_attribute))
+
+    return options
+
+
+#
+# Eager loading plan for dumping `model` rows with `schema_class`.
+#
+# Every Nested field (or List of Nested) backed by a relationship becomes a
+# joinedload (many-to-one) or selectinload (collections), with the loads of
+# the nested schema's own nested fields chained below it, honouring the
+# only/exclude given to each Nested. Dumping then runs a fixed number of
+# queries however many rows there are. Planned once per schema and fieldset.
+#
+@lru_cache(maxsize=128)
+def eager_loads(model, schema_class, only=None):
+    return tuple(_eager_loads(schema_class(only=only), inspect(model), ()))
+
+
+def _eager_loads(schema, mapper, path):
+    options = []
+
+    for name, field in schema.dump_fields.items():
+        if isinstance(field, fields.List):
+            field = field.inner
+        if not isinstance(field, fields.Nested):
+            continue
+
+        key = field.attribute or name
+        if key not in mapper.relationships:
+            continue
+
+        relationship = mapper.relationships[key]
+        # Schemas nesting each other without only/exclude would recurse forever
+        if relationship in path:
+            continue
+
+        loader = (selectinload if relationship.uselist else joinedload)(relationship.class_attribute)
+        nested = _eager_loads(field.schema, relationship.mapper, path + (relationship,))
+        options.append(loader.options(*nested) if nested else loader)
+
+    return options
@@ -56,6 +56,16 @@ def unsupported_media_type_error(error):
     }
     return jsonify(response), 415
 
+# 503 Service Unavailable Error Handler
+@errors_bp.app_errorhandler(503)
+def service_unavailable_error(error):
+    response = {
+        "error": "Service Unavailable",
+        "message": str(error.description) if error.description else "The service is busy. Please retry shortly."
+    }
+    retry_after = getattr(error, 'retry_after', None)
+    return jsonify(response), 503, {"Retry-After": str(retry_after)} if retry_after else {}
+
 # 500 Internal Server Error Handler
 @errors_bp.app_errorhandler(500)
 def internal_server_error(error):
@@ -1,8 +1,10 @@
-from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.extensions import db, unit_of_work
+from app.passwords import hash_password, check_password, needs_rehash, hash_otp, check_otp
 from sqlalchemy_utils import Timestamp
-from uuid import uuid4
-from sqlalchemy import String, ARRAY
+from app.ids import CompactUUID, new_id, NIL_ID
+from sqlalchemy import String, ARRAY, DDL, event, func, inspect, insert, update, delete, select, literal
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime
 #
 # Model: Base
@@ -21,7 +23,7 @@ class UserTypes(db.Enum):
 
 class Agent(BaseModel):
     __tablename__ = 'agent'
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
     lastname = db.Column(db.String(64), nullable=False)
     firstname = db.Column(db.String(64), nullable=False)
     email = db.Column(db.String(120),  unique=True, nullable=False)
@@ -34,17 +36,20 @@ class Agent(BaseModel):
     is_active = db.Column(db.Boolean(), default=False)
     account_type  = db.Column(db.Integer, default=1)
 
-    distributor_id = db.Column(db.String(36), db.ForeignKey('distributor.id'))
-    profile_id = db.Column(db.String(36), db.ForeignKey('profile.id'))
+    distributor_id = db.Column('distributor_id_bin', CompactUUID, db.ForeignKey('distributor.id_bin'), index=True)
+    profile_id = db.Column('profile_id_bin', CompactUUID, db.ForeignKey('profile.id_bin'))
 
     def __repr__(self):
         return '<Agent {}>'.format(self.firstname)
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password)
 
     @classmethod
     def get_user_by_id(cls, id):
@@ -56,11 +61,11 @@ class Agent(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
 
 #
@@ -69,7 +74,7 @@ class Agent(BaseModel):
 class Distributor(BaseModel):
     __tablename__ = 'distributor'
     
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
     business_name = db.Column(db.String(120), unique=True, nullable=False)
     representative_name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -86,7 +91,7 @@ class Distributor(BaseModel):
     is_active = db.Column(db.Boolean(), default=False)
     account_type  = db.Column(db.Integer, default=2)
 
-    profile_id = db.Column(db.String(36), db.ForeignKey('profile.id'))
+    profile_id = db.Column('profile_id_bin', CompactUUID, db.ForeignKey('profile.id_bin'))
 
     agents = db.relationship('Agent', backref='distributor', lazy=True)
     # purchases = db.relationship('Purchase', backref='distributor', lazy=True)
@@ -96,10 +101,13 @@ class Distributor(BaseModel):
         return f"<Distributor {self.business_name}>"
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password)
 
 
     @classmethod
@@ -108,11 +116,11 @@ class Distributor(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     @classmethod
     def get_user_by_email(cls, email):
@@ -120,20 +128,30 @@ class Distributor(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
 
 #
 # Model: Purchases
 #
 
+# Columns matched by free-text purchase search
+PURCHASE_SEARCH_COLUMNS = ('firstname', 'lastname', 'email', 'phone_number', 'product', 'product_category')
+
 class Purchase(BaseModel):
     __tablename__ = 'purchase'
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
+    __table_args__ = (
+        # Sort key of the keyset-paginated purchase listing
+        db.Index('ix_purchase_purchase_date_id_bin', 'purchase_date', 'id_bin'),
+        # Free-text search on MySQL; SQLite uses the purchase_fts table below
+        db.Index('ix_purchase_search', *PURCHASE_SEARCH_COLUMNS, mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
     lastname = db.Column(db.String(64), nullable=False)
     firstname = db.Column(db.String(64), nullable=False)
     email = db.Column(db.String(120), nullable=False)
@@ -142,13 +160,13 @@ class Purchase(BaseModel):
     phone_number = db.Column(db.String(15), nullable=False)
     receipt_image = db.Column(db.String(255), nullable=True)
     product_image = db.Column(db.String(255), nullable=True)
-    purchase_status = db.Column(db.String(20), default='pending')
+    purchase_status = db.Column(db.String(20), default='pending', index=True)
     purchase_date = db.Column(db.DateTime, default=datetime.utcnow)
     purchase_secret = db.Column(db.String(20), unique=True, nullable=False)
 
 
-    agent_id = db.Column(db.String(36), db.ForeignKey('agent.id'), nullable=False)
-    distributor_id = db.Column(db.String(36), db.ForeignKey('distributor.id'), nullable=True)
+    agent_id = db.Column('agent_id_bin', CompactUUID, db.ForeignKey('agent.id_bin'), nullable=False, index=True)
+    distributor_id = db.Column('distributor_id_bin', CompactUUID, db.ForeignKey('distributor.id_bin'), nullable=True, index=True)
 
     agent = db.relationship('Agent', backref='purchases', lazy=True)
     # distributor = db.relationship('Distributor', backref='purchases')
@@ -166,11 +184,165 @@ class Purchase(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
+
+
+#
+# SQLite full-text index for purchases: an external-content FTS5 table over
+# purchase.rowid, kept in sync by triggers. If a VACUUM renumbers rowids, run
+# "INSERT INTO purchase_fts(purchase_fts) VALUES ('rebuild')".
+#
+_fts_columns = ', '.join(PURCHASE_SEARCH_COLUMNS)
+_fts_new = ', '.join('new.' + column for column in PURCHASE_SEARCH_COLUMNS)
+_fts_old = ', '.join('old.' + column for column in PURCHASE_SEARCH_COLUMNS)
+
+PURCHASE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE purchase_fts USING fts5({_fts_columns}, content='purchase', content_rowid='rowid')",
+    f"CREATE TRIGGER purchase_fts_ai AFTER INSERT ON purchase BEGIN "
+    f"INSERT INTO purchase_fts(rowid, {_fts_columns}) VALUES (new.rowid, {_fts_new}); END",
+    f"CREATE TRIGGER purchase_fts_ad AFTER DELETE ON purchase BEGIN "
+    f"INSERT INTO purchase_fts(purchase_fts, rowid, {_fts_columns}) VALUES ('delete', old.rowid, {_fts_old}); END",
+    f"CREATE TRIGGER purchase_fts_au AFTER UPDATE OF {_fts_columns} ON purchase BEGIN "
+    f"INSERT INTO purchase_fts(purchase_fts, rowid, {_fts_columns}) VALUES ('delete', old.rowid, {_fts_old}); "
+    f"INSERT INTO purchase_fts(rowid, {_fts_columns}) VALUES (new.rowid, {_fts_new}); END",
+]
+
+for _statement in PURCHASE_FTS_DDL:
+    event.listen(Purchase.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+event.listen(Purchase.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS purchase_fts").execute_if(dialect='sqlite'))
+
+
+#
+# Model: Sales rollup
+#
+# Purchase counts per day, agent, distributor, category and status. Rows are
+# adjusted as purchases are written (see the Purchase mapper events below), so
+# dashboards never have to scan the purchase table.
+#
+class SalesRollup(db.Model):
+    __tablename__ = 'sales_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+    agent_id = db.Column('agent_id_bin', CompactUUID, primary_key=True)
+    # NIL_ID when the purchase has no distributor, primary key columns can't be NULL
+    distributor_id = db.Column('distributor_id_bin', CompactUUID, primary_key=True, default=NIL_ID)
+    product_category = db.Column(db.String(120), primary_key=True)
+    purchase_status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    GROUP_COLUMNS = ('day', 'agent_id', 'distributor_id', 'product_category', 'purchase_status')
+
+    def __repr__(self):
+        return f"<SalesRollup {self.day} agent={self.agent_id} status={self.purchase_status} count={self.count}>"
+
+    @classmethod
+    def group_of(cls, purchase):
+        """Rollup key of a purchase, given as a model instance or a column dict."""
+        get = purchase.get if isinstance(purchase, dict) else lambda name: getattr(purchase, name)
+        purchase_date = get('purchase_date') or datetime.utcnow()
+        return (
+            purchase_date.date(),
+            get('agent_id'),
+            get('distributor_id') or NIL_ID,
+            get('product_category'),
+            get('purchase_status') or 'pending',
+        )
+
+    @classmethod
+    def apply(cls, connection, deltas):
+        """Add {group key: delta} to the rollup rows, creating missing ones and deleting emptied ones."""
+        for group, delta in deltas.items():
+            if not delta:
+                continue
+
+            values = dict(zip(cls.GROUP_COLUMNS, group), count=delta)
+
+            if connection.dialect.name == 'mysql':
+                statement = mysql_insert(cls).values(**values)
+                statement = statement.on_duplicate_key_update(count=cls.count + statement.inserted.count)
+            else:
+                statement = sqlite_insert(cls).values(**values)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[getattr(cls, name) for name in cls.GROUP_COLUMNS], set_={'count': cls.count + statement.excluded.count}
+                )
+
+            connection.execute(statement)
+
+            if delta < 0:
+                connection.execute(delete(cls).where(
+                    *(getattr(cls, name) == value for name, value in zip(cls.GROUP_COLUMNS, group)), cls.count <= 0
+                ))
+
+    @classmethod
+    def record(cls, connection, purchases):
+        """Count purchases inserted outside the ORM unit of work (bulk inserts)."""
+        deltas = {}
+        for purchase in purchases:
+            group = cls.group_of(purchase)
+            deltas[group] = deltas.get(group, 0) + 1
+        cls.apply(connection, deltas)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every rollup row from the purchase table."""
+        day = func.date(Purchase.purchase_date)
+        distributor_id = func.coalesce(Purchase.distributor_id, literal(NIL_ID, CompactUUID))
+        purchase_status = func.coalesce(Purchase.purchase_status, 'pending')
+
+        totals = select(
+            day, Purchase.agent_id, distributor_id, Purchase.product_category, purchase_status, func.count()
+        ).group_by(day, Purchase.agent_id, distributor_id, Purchase.product_category, purchase_status)
+
+        db.session.execute(delete(cls))
+        db.session.execute(insert(cls).from_select([getattr(cls, name) for name in cls.GROUP_COLUMNS] + [cls.count], totals))
+        unit_of_work.commit()
+
+
+@event.listens_for(Purchase, 'after_insert')
+def _rollup_purchase_inserted(mapper, connection, target):
+    SalesRollup.apply(connection, {SalesRollup.group_of(target): 1})
+
+
+# Purchase attributes that decide the rollup row of a purchase
+_ROLLUP_ATTRIBUTES = ('purchase_date', 'agent_id', 'distributor_id', 'product_category', 'purchase_status')
+
+
+def _load_replaced_value(target, value, oldvalue, initiator):
+    pass
+
+
+# Setting an expired attribute records no old value unless it is loaded first,
+# and without it an update could not tell which rollup row to take the purchase from
+for _name in _ROLLUP_ATTRIBUTES:
+    event.listen(getattr(Purchase, _name), 'set', _load_replaced_value, active_history=True)
+
+
+@event.listens_for(Purchase, 'after_update')
+def _rollup_purchase_updated(mapper, connection, target):
+    state = inspect(target)
+
+    if not any(state.attrs[name].history.has_changes() for name in _ROLLUP_ATTRIBUTES):
+        return
+
+    previous = {}
+    for name in _ROLLUP_ATTRIBUTES:
+        history = state.attrs[name].history
+        previous[name] = history.deleted[0] if history.deleted else getattr(target, name)
+
+    old_group, new_group = SalesRollup.group_of(previous), SalesRollup.group_of(target)
+
+    if old_group != new_group:
+        SalesRollup.apply(connection, {old_group: -1, new_group: 1})
+
+
+@event.listens_for(Purchase, 'after_delete')
+def _rollup_purchase_deleted(mapper, connection, target):
+    SalesRollup.apply(connection, {SalesRollup.group_of(target): -1})
 
 
 # 
@@ -178,7 +350,7 @@ class Purchase(BaseModel):
 # 
 class Profile(BaseModel):
     __tablename__ = 'profile'
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
     lastname = db.Column(db.String(64), nullable=False)
     firstname = db.Column(db.String(64), nullable=False)
     email = db.Column(db.String(120),  unique=True, nullable=False)
@@ -200,21 +372,27 @@ class Profile(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
 
 
 
 class ApprovalRequest(BaseModel):
     __tablename__ = 'approval_request'
-    
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
-    agent_id = db.Column(db.String(36), db.ForeignKey('agent.id'), nullable=False)
-    distributor_id = db.Column(db.String(36), db.ForeignKey('distributor.id'), nullable=False)
+    __table_args__ = (
+        # Pending requests of a distributor
+        db.Index('ix_approval_request_distributor_id_bin_status', 'distributor_id_bin', 'status'),
+        # get_pending_request
+        db.Index('ix_approval_request_agent_id_bin_distributor_id_bin_status', 'agent_id_bin', 'distributor_id_bin', 'status'),
+    )
+
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
+    agent_id = db.Column('agent_id_bin', CompactUUID, db.ForeignKey('agent.id_bin'), nullable=False)
+    distributor_id = db.Column('distributor_id_bin', CompactUUID, db.ForeignKey('distributor.id_bin'), nullable=False)
     status = db.Column(db.Enum('pending', 'approved', 'rejected', name='request_status'), default='pending')
     
     # Relationships
@@ -230,11 +408,11 @@ class ApprovalRequest(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     @classmethod
     def get_pending_request(cls, agent_id, distributor_id):
@@ -244,7 +422,7 @@ class ApprovalRequest(BaseModel):
 class InsuranceCompany(BaseModel):
     __tablename__ = 'insurance_company'
 
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid4()))
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(256), nullable=False)
     company_name = db.Column(db.String(128), nullable=False)
@@ -267,10 +445,13 @@ class InsuranceCompany(BaseModel):
         return f"<InsuranceCompany(id={self.id}, name={self.company_name})>"
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password)
 
 
     @classmethod
@@ -279,11 +460,11 @@ class InsuranceCompany(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
     @classmethod
     def get_user_by_email(cls, email):
@@ -291,18 +472,180 @@ class InsuranceCompany(BaseModel):
 
     def save(self):
         db.session.add(self)
-        db.session.commit()
+        unit_of_work.commit()
+
+    def delete(self):
+        db.session.delete(self)
+        unit_of_work.commit()
+
+
+# Account table of each account_type
+ACCOUNT_MODELS = {
+    1: Agent,
+    2: Distributor,
+    3: InsuranceCompany,
+}
+
+# Account model of each JWT role; tokens carry the account_type as role
+ACCOUNT_MODELS_BY_ROLE = {
+    **ACCOUNT_MODELS,
+    'agent': Agent,
+    'distributor': Distributor,
+    'insurance': InsuranceCompany,
+}
+
+ACCOUNT_TYPES = {model: account_type for account_type, model in ACCOUNT_MODELS.items()}
+
+DISTRIBUTOR_ROLES = tuple(role for role, model in ACCOUNT_MODELS_BY_ROLE.items() if model is Distributor)
+
+# Roles of staff tokens ('flask authentication issue-token'); no account table behind them
+ADMIN_ROLE = 'admin'
+FINANCE_ROLE = 'finance'
+STAFF_ROLES = (ADMIN_ROLE, FINANCE_ROLE)
+
+
+#
+# Model: Account directory
+#
+# One row per account of any type, keyed by lower-cased email, so the table
+# (and role) behind an email is a primary key lookup. Kept in step with the
+# account tables by the mapper events below.
+#
+class AccountDirectory(db.Model):
+    __tablename__ = 'account_directory'
+    __table_args__ = (
+        db.Index('ix_account_directory_account_type_account_id_bin', 'account_type', 'account_id_bin'),
+    )
+
+    email = db.Column(db.String(120), primary_key=True)
+    account_type = db.Column(db.Integer, nullable=False)
+    account_id = db.Column('account_id_bin', CompactUUID, nullable=False)
+
+    def __repr__(self):
+        return f"<AccountDirectory {self.email} type={self.account_type}>"
+
+    @classmethod
+    def get_entry(cls, email):
+        return db.session.get(cls, email.lower())
+
+    @classmethod
+    def get_account(cls, email):
+        """The Agent, Distributor or InsuranceCompany registered with an email, if any."""
+        entry = cls.get_entry(email)
+        if entry is None:
+            return None
+        return db.session.get(ACCOUNT_MODELS[entry.account_type], entry.account_id)
+
+
+def _directory_entry_of(target):
+    return (AccountDirectory.account_type == ACCOUNT_TYPES[type(target)]) & (AccountDirectory.account_id == target.id)
+
+
+def _account_inserted(mapper, connection, target):
+    connection.execute(insert(AccountDirectory).values(
+        email=target.email.lower(), account_type=ACCOUNT_TYPES[type(target)], account_id=target.id
+    ))
+
+
+def _account_updated(mapper, connection, target):
+    if inspect(target).attrs.email.history.has_changes():
+        connection.execute(update(AccountDirectory).where(_directory_entry_of(target)).values(email=target.email.lower()))
+
+
+def _account_deleted(mapper, connection, target):
+    connection.execute(delete(AccountDirectory).where(_directory_entry_of(target)))
+
+
+for _model in ACCOUNT_MODELS.values():
+    event.listen(_model, 'after_insert', _account_inserted)
+    event.listen(_model, 'after_update', _account_updated)
+    event.listen(_model, 'after_delete', _account_deleted)
+
+
+#
+# Model: Token revocation
+#
+# Either one revoked token (jti) or every token of an account issued before
+# revoked_before. Rows only matter until the tokens they cover expire.
+#
+class TokenRevocation(db.Model):
+    __tablename__ = 'token_revocation'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(36), index=True)
+    email = db.Column(db.String(120), index=True)
+    revoked_before = db.Column(db.DateTime)
+    expires = db.Column(db.DateTime, nullable=False, index=True)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<TokenRevocation jti={self.jti} email={self.email}>"
+
+    @classmethod
+    def active(cls, since=None):
+        """Unexpired revocations, only those created at or after `since` if given."""
+        query = cls.query.filter(cls.expires > datetime.utcnow())
+        if since is not None:
+            query = query.filter(cls.created >= since)
+        return query.all()
+
+    @classmethod
+    def prune(cls, now=None):
+        """Delete the rows whose tokens have all expired."""
+        deleted = cls.query.filter(cls.expires <= (now or datetime.utcnow())).delete(synchronize_session=False)
+        unit_of_work.commit()
+        return deleted
+
+    def save(self):
+        db.session.add(self)
+        unit_of_work.commit()
+
+
+#
+# Model: One-time password
+#
+# The live verification code of an email address, kept as a digest only.
+# Issuing a new code replaces the previous one.
+#
+class OneTimePassword(db.Model):
+    __tablename__ = 'one_time_password'
+
+    email = db.Column(db.String(120), primary_key=True)
+    code_hash = db.Column(db.String(64), nullable=False)
+    expires = db.Column(db.DateTime, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OneTimePassword {self.email}>"
+
+    @classmethod
+    def issue(cls, email, code, lifetime):
+        now = datetime.utcnow()
+        otp = db.session.merge(cls(email=email, code_hash=hash_otp(code), expires=now + lifetime, attempts=0, created=now))
+        unit_of_work.commit()
+        return otp
+
+    def is_expired(self):
+        return self.expires <= datetime.utcnow()
+
+    def verify(self, code):
+        return check_otp(self.code_hash, code)
+
+    def save(self):
+        db.session.add(self)
+        unit_of_work.commit()
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        unit_of_work.commit()
 
 
 class Policy(db.Model):  # Updated for linkage
-    id = db.Column(db.String(36), primary_key=True)
-    agent_id = db.Column(db.String(36), db.ForeignKey('agent.id'), nullable=False)
-    purchase_id = db.Column(db.String(36), db.ForeignKey('purchase.id'), nullable=False)
-    insurance_company_id = db.Column(db.String(36), db.ForeignKey('insurance_company.id'), nullable=False)
+    id = db.Column('id_bin', CompactUUID, primary_key=True, default=new_id)
+    agent_id = db.Column('agent_id_bin', CompactUUID, db.ForeignKey('agent.id_bin'), nullable=False)
+    purchase_id = db.Column('purchase_id_bin', CompactUUID, db.ForeignKey('purchase.id_bin'), nullable=False)
+    insurance_company_id = db.Column('insurance_company_id_bin', CompactUUID, db.ForeignKey('insurance_company.id_bin'), nullable=False)
     start_date = db.Column(db.DateTime, default=datetime.utcnow)
     end_date = db.Column(db.DateTime, nullable=False)
     is_active = db.Column(db.Boolean, default=False)
\ No newline at end of file
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import DateTime, and_, or_
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+#
+# Read the page size from a query string value.
+#
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value is None or value == "":
+        return default
+
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        abort(400, description="limit must be a positive integer.")
+
+    if limit < 1:
+        abort(400, description="limit must be a positive integer.")
+
+    return min(limit, maximum)
+
+
+#
+# Turn the sort key of the last row of a page into an opaque cursor.
+#
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+#
+# Turn a cursor back into sort key values, typed after the given columns.
+#
+def decode_cursor(cursor, columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+
+    except (binascii.Error, TypeError, ValueError):
+        abort(400, description="Invalid pagination cursor.")
+
+
+#
+# Row-value comparison "(c1, c2, ...) > (v1, v2, ...)" spelled out for every
+# backend. The redundant "c1 >= v1" gives the planner a range to seek to on
+# the composite index instead of scanning it from the start.
+#
+def _after(columns, values):
+    clauses = []
+    for position, column in enumerate(columns):
+        equal = [columns[i] == values[i] for i in range(position)]
+        clauses.append(and_(*equal, column > values[position]))
+    return and_(columns[0] >= values[0], or_(*clauses))
+
+
+#
+# Keyset pagination: seek past the cursor instead of using OFFSET, so every
+# page costs the same no matter how deep the client is.
+#
+# Returns the rows of the page and the cursor of the next page (None on the last page).
+# sort_key reads the sort key values off a row when they aren't plain attributes of it.
+#
+def keyset_paginate(query, columns, limit, cursor=None, sort_key=None):
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+
+    rows = query.order_by(*columns).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key(last) if sort_key else [getattr(last, column.key) for column in columns])
+
+    return rows, next_cursor
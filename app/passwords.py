@@ -0,0 +1,63 @@
+import hashlib
+import hmac
+import secrets
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.extensions import hashing_pool
+
+
+DEFAULT_HASH_METHOD = 'scrypt'
+
+
+def _configured_method():
+    return current_app.config.get('PASSWORD_HASH_METHOD') or DEFAULT_HASH_METHOD
+
+
+#
+# Full method string werkzeug writes for a configured method, e.g.
+# "pbkdf2" -> "pbkdf2:sha256:600000".
+#
+@lru_cache(maxsize=None)
+def _hash_prefix(method):
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+#
+# Hash a password with the configured algorithm and cost, or check one.
+# Both run on the bounded hashing pool (see HashingPool).
+#
+def hash_password(password):
+    return hashing_pool.run(generate_password_hash, password, _configured_method())
+
+
+def check_password(password_hash, password):
+    return hashing_pool.run(check_password_hash, password_hash, password)
+
+
+#
+# Whether a stored hash was made with another algorithm or cost than the
+# configured one, and should be replaced the next time the password is known.
+#
+def needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != _hash_prefix(_configured_method())
+
+
+#
+# One-time passwords: short numeric codes stored as a keyed digest. They
+# expire within minutes and allow a few attempts, so unlike account
+# passwords they don't need a slow hash.
+#
+def generate_otp(digits=6):
+    return f"{secrets.randbelow(10 ** digits):0{digits}d}"
+
+
+def hash_otp(code):
+    key = current_app.config['SECRET_KEY'].encode('utf-8')
+    return hmac.new(key, code.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def check_otp(code_hash, code):
+    return hmac.compare_digest(code_hash, hash_otp(code))
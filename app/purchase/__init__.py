@@ -2,4 +2,4 @@ from flask import Blueprint
 
 bp = Blueprint('purchase', __name__)
 
-from app.purchase import purchase_routes
+from app.purchase import purchase_routes, purchase_commands
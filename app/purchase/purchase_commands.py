@@ -0,0 +1,16 @@
+#
+# CLI: flask purchase <command>
+#
+import click
+
+from app.purchase import bp
+from app.models import SalesRollup
+
+
+#
+# Recompute the sales rollups from the purchase table
+#
+@bp.cli.command('rebuild-rollups')
+def rebuild_rollups():
+    SalesRollup.rebuild()
+    click.echo("Sales rollups rebuilt.")
@@ -1,10 +1,21 @@
 from app.purchase import bp
 
-from flask import request, current_app, jsonify
+from flask import request, current_app, jsonify, abort, Response, stream_with_context
 from marshmallow import ValidationError
 from app.purchase import purchase_service
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from utils.random_secret import generate_secret
+from app.pagination import parse_limit
+from datetime import datetime, date
+from app.models import SalesRollup, Purchase, Distributor, FINANCE_ROLE, DISTRIBUTOR_ROLES
+from app.schemas import PurchaseSchema
+from app.fieldsets import parse_fields
+from app.conditional import conditional_get
+from app.authentication.decorators import role_required
+
+
+# Largest number of purchases accepted by one batch call
+MAX_BATCH_SIZE = 500
 
 
 #
@@ -33,18 +44,145 @@ def register_buyer():
     
 
 #
-# Get all purchases
+# Register a batch of purchases queued offline
+#
+@bp.post('/purchase/batch')
+@jwt_required()
+def register_buyer_batch():
+    user_identity = get_jwt_identity()
+
+    agent_id = purchase_service.get_agent_id_from_user(user_identity['email'])
+
+    if not agent_id:
+        abort(403, description="Only agents can register purchases.")
+
+    purchases_info = request.get_json()
+
+    if not isinstance(purchases_info, list) or not purchases_info:
+        abort(400, description="Expected a non-empty list of purchases.")
+
+    if len(purchases_info) > MAX_BATCH_SIZE:
+        abort(400, description=f"A batch cannot contain more than {MAX_BATCH_SIZE} purchases.")
+
+    for purchase_info in purchases_info:
+        if isinstance(purchase_info, dict):
+            purchase_info['agent_id'] = agent_id
+            purchase_info['purchase_secret'] = generate_secret(8)
+
+    response = purchase_service.registerPurchaseBatch(purchases_info)
+
+    created = sum(1 for result in response if result['success'])
+
+    return jsonify({
+        "success": created == len(response),
+        "message": f"{created} of {len(response)} Sales Registered",
+        "data": response
+    }), 201 if created else 400
+
+
+#
+# Get all purchases, one page at a time
 #
 @bp.get('/purchase')
 def get_purchases():
-    response = purchase_service.getAllPurchases()
+    limit = parse_limit(request.args.get('limit'))
+    cursor = request.args.get('cursor')
+    only = parse_fields(request.args.get('fields'), PurchaseSchema)
+
+    response = purchase_service.getAllPurchases(limit, cursor, only)
+
+    return jsonify({
+        "success": True,
+        "message": "All Sales Retrieved Successfully",
+        "data": response['items'],
+        "pagination": {"limit": limit, "next_cursor": response['next_cursor']}
+    })
+
+#
+# Search purchases
+#
+@bp.get('/purchase/search')
+def search_purchases():
+    limit = parse_limit(request.args.get('limit'))
+    cursor = request.args.get('cursor')
+    only = parse_fields(request.args.get('fields'), PurchaseSchema)
+
+    filters = {
+        name: request.args[name]
+        for name in purchase_service.SEARCH_FILTERS
+        if request.args.get(name)
+    }
+
+    try:
+        date_from = datetime.fromisoformat(request.args['date_from']) if request.args.get('date_from') else None
+        date_to = datetime.fromisoformat(request.args['date_to']) if request.args.get('date_to') else None
+    except ValueError:
+        abort(400, description="date_from and date_to must be ISO 8601 dates.")
+
+    response = purchase_service.searchPurchases(filters, request.args.get('q'), limit, cursor, date_from, date_to, only)
+
+    return jsonify({
+        "success": True,
+        "message": "Sales Retrieved Successfully",
+        "data": response['items'],
+        "pagination": {"limit": limit, "next_cursor": response['next_cursor']}
+    })
+
+#
+# Sales statistics for dashboards
+#
+# Distributors only see the sales of their own network; admins see all of them.
+#
+@bp.get('/purchase/stats')
+@role_required(*DISTRIBUTOR_ROLES)
+def get_sales_stats():
+    group_by = [name for name in request.args.get('group_by', 'day').split(',') if name]
+
+    unknown = [name for name in group_by if name not in SalesRollup.GROUP_COLUMNS]
+    if unknown or not group_by:
+        abort(400, description="group_by must be a comma separated list of: " + ", ".join(SalesRollup.GROUP_COLUMNS))
+
+    filters = {
+        name: request.args[name]
+        for name in SalesRollup.GROUP_COLUMNS
+        if name != 'day' and request.args.get(name)
+    }
+
+    if isinstance(current_user, Distributor):
+        filters['distributor_id'] = current_user.id
+
+    try:
+        date_from = date.fromisoformat(request.args['date_from']) if request.args.get('date_from') else None
+        date_to = date.fromisoformat(request.args['date_to']) if request.args.get('date_to') else None
+    except ValueError:
+        abort(400, description="date_from and date_to must be ISO 8601 dates.")
+
+    response = purchase_service.getSalesStats(group_by, filters, date_from, date_to)
+
+    return jsonify({"success": True, "message": "Sales Statistics Retrieved Successfully", "data": response})
+
+#
+# Export all purchases as NDJSON or CSV
+#
+@bp.get('/purchase/export')
+@role_required(FINANCE_ROLE)
+def export_purchases():
+    export_format = request.args.get('format', 'ndjson')
+
+    if export_format not in purchase_service.EXPORT_FORMATS:
+        abort(400, description="format must be one of: " + ", ".join(purchase_service.EXPORT_FORMATS))
 
-    return jsonify({ "success": True, "message": "All Sales Retrieved Successfully", "data": response})
+    return Response(
+        stream_with_context(purchase_service.exportPurchases(export_format)),
+        mimetype=purchase_service.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename=purchases.{export_format}"}
+    )
 
 #
 # Get all purchases
 #
 @bp.get('/purchase/<purchase_id>')
+@conditional_get(Purchase, id_arg='purchase_id', related=[Purchase.agent])
 def purchase_detail(purchase_id):
 
     # upload_result = current_app.cloudinary_service.upload_image("https://res.cloudinary.com/demo/image/upload/getting-started/shoes.jpg", "shoes")
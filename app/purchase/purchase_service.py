@@ -1,28 +1,215 @@
+import csv
+import io
+import json
+import re
+from app import db
+from app.extensions import unit_of_work
 from app.schemas import PurchaseSchema, AgentSchema
 from flask import jsonify, abort
-from app.models import Purchase, Agent
-from sqlalchemy.exc import SQLAlchemyError
+from app.models import Purchase, Agent, SalesRollup, PURCHASE_SEARCH_COLUMNS
+from datetime import datetime
+from app.ids import CompactUUID, NIL_ID, new_id
+from sqlalchemy import select, insert, text, func, Float
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.orm import joinedload
 from marshmallow.exceptions import ValidationError
 from app.schemas import PurchaseRegistrationSchema
+from app.pagination import keyset_paginate
+from app.serializers import compiled_dump
+from app.fieldsets import loader_options
 
 
-def getAllPurchases():
+#
+# Get one page of purchases, ordered by (purchase_date, id)
+#
+# `only` restricts both the loaded columns and the dumped fields.
+#
+def getAllPurchases(limit, cursor=None, only=None):
     try:
-        purchases = Purchase.query.options(joinedload(Purchase.agent)).all()
+        query = Purchase.query.options(*loader_options(
+            Purchase, only, required=[Purchase.purchase_date], schema=PurchaseSchema
+        ))
 
-        products_schema = PurchaseSchema(many=True)
-        products = products_schema.dump(purchases)
+        purchases, next_cursor = keyset_paginate(query, [Purchase.purchase_date, Purchase.id], limit, cursor)
+
+        products = compiled_dump(PurchaseSchema, only)(purchases)
+
+        return {"items": products, "next_cursor": next_cursor}
 
-        return products
-    
     except SQLAlchemyError as e:
-        
-        return jsonify({"error": "An error occurred while fetching purchases"}), 500
-    
-    except Exception as e:
-       
-        return jsonify({"error": "An unexpected error occurred"}), 500
+        abort(500, description="An error occurred while fetching purchases")
+
+# Search filters and the column each one matches exactly
+SEARCH_FILTERS = {
+    'status': Purchase.purchase_status,
+    'category': Purchase.product_category,
+    'product': Purchase.product,
+    'email': Purchase.email,
+    'phone_number': Purchase.phone_number,
+    'agent_id': Purchase.agent_id,
+    'distributor_id': Purchase.distributor_id,
+}
+
+
+#
+# Search purchases with exact-match filters, a purchase date range and free text.
+#
+# Without free text, results come in (purchase_date, id) order like the listing.
+# With it, they are ranked by relevance using the FTS5 index on SQLite or the
+# FULLTEXT index on MySQL, and paged on (score, id).
+#
+def searchPurchases(filters, query_text, limit, cursor=None, date_from=None, date_to=None, only=None):
+    try:
+        query = db.session.query(Purchase).options(*loader_options(
+            Purchase, only, required=[Purchase.purchase_date], schema=PurchaseSchema
+        ))
+
+        for name, value in filters.items():
+            query = query.filter(SEARCH_FILTERS[name] == value)
+
+        if date_from:
+            query = query.filter(Purchase.purchase_date >= date_from)
+
+        if date_to:
+            query = query.filter(Purchase.purchase_date < date_to)
+
+        terms = re.findall(r'\w+', query_text or '')
+
+        if not terms:
+            purchases, next_cursor = keyset_paginate(query, [Purchase.purchase_date, Purchase.id], limit, cursor)
+        else:
+            matches = _text_matches(terms)
+            query = query.join(matches, matches.c.id == Purchase.id).add_columns(matches.c.score)
+
+            rows, next_cursor = keyset_paginate(
+                query, [matches.c.score, Purchase.id], limit, cursor,
+                sort_key=lambda row: [row.score, row.Purchase.id]
+            )
+            purchases = [row.Purchase for row in rows]
+
+        return {"items": compiled_dump(PurchaseSchema, only)(purchases), "next_cursor": next_cursor}
+
+    except SQLAlchemyError as e:
+        abort(500, description="An error occurred while searching purchases")
+
+
+#
+# Ids of the purchases matching every term, with a score where lower ranks higher.
+#
+def _text_matches(terms):
+    if db.engine.dialect.name == 'mysql':
+        columns = ', '.join(PURCHASE_SEARCH_COLUMNS)
+        statement = text(
+            f"SELECT id_bin AS id, -MATCH({columns}) AGAINST (:terms IN BOOLEAN MODE) AS score "
+            f"FROM purchase WHERE MATCH({columns}) AGAINST (:terms IN BOOLEAN MODE)"
+        ).bindparams(terms=' '.join(f'+{term}*' for term in terms))
+
+    else:
+        statement = text(
+            "SELECT purchase.id_bin AS id, bm25(purchase_fts) AS score "
+            "FROM purchase_fts JOIN purchase ON purchase.rowid = purchase_fts.rowid "
+            "WHERE purchase_fts MATCH :terms"
+        ).bindparams(terms=' '.join(f'"{term}"*' for term in terms))
+
+    return statement.columns(id=CompactUUID, score=Float).subquery('matches')
+
+
+#
+# Sales counts read from the rollup table, grouped by any of SalesRollup.GROUP_COLUMNS.
+#
+def getSalesStats(group_by, filters, date_from=None, date_to=None):
+    try:
+        columns = [getattr(SalesRollup, name) for name in group_by]
+
+        query = db.session.query(*columns, func.sum(SalesRollup.count).label('count'))
+
+        for name, value in filters.items():
+            query = query.filter(getattr(SalesRollup, name) == value)
+
+        if date_from:
+            query = query.filter(SalesRollup.day >= date_from)
+
+        if date_to:
+            query = query.filter(SalesRollup.day < date_to)
+
+        rows = query.group_by(*columns).having(func.sum(SalesRollup.count) > 0).order_by(*columns).all()
+
+        return [
+            {
+                **{name: _stats_value(name, value) for name, value in zip(group_by, row)},
+                "count": int(row.count or 0)
+            }
+            for row in rows
+        ]
+
+    except SQLAlchemyError as e:
+        abort(500, description="An error occurred while fetching sales statistics")
+
+
+def _stats_value(name, value):
+    if name == 'day':
+        return value.isoformat()
+    # Purchases without a distributor are grouped under NIL_ID, reported as ''
+    if name == 'distributor_id' and value == NIL_ID:
+        return ''
+    return value
+
+
+# Rows fetched per round trip while exporting
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Nested agent fields are flattened into these columns in CSV exports
+EXPORT_AGENT_FIELDS = ['id', 'firstname', 'lastname']
+
+# Purchase fields that never leave the system in exports
+EXPORT_EXCLUDED_FIELDS = {'purchase_secret'}
+
+
+#
+# Stream every purchase as NDJSON lines or CSV rows.
+#
+# Rows are read through a server-side cursor in EXPORT_BATCH_SIZE batches and
+# serialized batch by batch, so memory stays flat however many sales there are.
+#
+def exportPurchases(export_format):
+    statement = (
+        select(Purchase)
+        .options(joinedload(Purchase.agent))
+        .order_by(Purchase.purchase_date, Purchase.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    only = tuple(name for name in PurchaseSchema().dump_fields if name not in EXPORT_EXCLUDED_FIELDS)
+    columns = None
+
+    for batch in db.session.scalars(statement).partitions():
+        products = compiled_dump(PurchaseSchema, only)(batch)
+
+        if export_format == 'ndjson':
+            yield ''.join(json.dumps(product) + '\n' for product in products)
+            continue
+
+        if columns is None:
+            columns = [name for name in only if name != 'agent']
+            yield _csv_lines([columns + ['agent_' + name for name in EXPORT_AGENT_FIELDS]])
+
+        yield _csv_lines(
+            [product.get(name) for name in columns]
+            + [(product.get('agent') or {}).get(name) for name in EXPORT_AGENT_FIELDS]
+            for product in products
+        )
+
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
 
 def get_purchase_by_id(purchase_id):
     try:
@@ -79,6 +266,53 @@ def registerNewPurchase(data):
 
 
 
+#
+# Register many purchases in one transaction.
+#
+# Every item goes through one shared schema instance; valid rows are written
+# with one multi-row INSERT and invalid ones are reported back by index.
+#
+def registerPurchaseBatch(purchases_info):
+    # Items are loaded one at a time: with many=True a field error in one item
+    # makes marshmallow skip validate_purchase for the whole batch.
+    purchase_schema = PurchaseRegistrationSchema(load_instance=False)
+
+    rows = []
+    results = []
+
+    for index, purchase_info in enumerate(purchases_info):
+        try:
+            purchase = purchase_schema.load(purchase_info)
+        except ValidationError as err:
+            results.append({"index": index, "success": False, "errors": err.messages})
+            continue
+
+        # Bulk inserts skip Python column defaults, so every row gets its key here
+        purchase['id'] = new_id()
+        purchase.setdefault('purchase_date', datetime.utcnow())
+        rows.append(purchase)
+        results.append({"index": index, "success": True, "id": purchase['id']})
+
+    if not rows:
+        return results
+
+    try:
+        db.session.execute(insert(Purchase), rows)
+        # Bulk inserts bypass the mapper events that maintain the rollups
+        SalesRollup.record(db.session.connection(), rows)
+        unit_of_work.commit()
+
+    except IntegrityError as e:
+        db.session.rollback()
+        abort(400, description="The batch conflicts with existing purchases or references an unknown agent.")
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        abort(500, description="An error occurred while registering the purchases")
+
+    return results
+
+
 def get_agent_id_from_user(email):
     try:
         user_info = Agent.get_user_by_email(email)
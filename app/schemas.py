@@ -1,9 +1,9 @@
 from app import ma
 from flask import current_app
-from app.models import Profile, Agent, Distributor, Purchase, ApprovalRequest, InsuranceCompany
+from app.models import Profile, Agent, Distributor, Purchase, ApprovalRequest, InsuranceCompany, AccountDirectory
 from marshmallow import fields, validates_schema, ValidationError, EXCLUDE, post_load
-from werkzeug.security import check_password_hash
-import re
+from app.uniqueness import check_unique
+from app.validation import Rules, required, min_length, pattern, all_patterns, equal_to
 from enum import Enum
 
 
@@ -14,6 +14,29 @@ class AgentRequestStatusEnum(Enum):
     ACCEPTED = "accepted"
 
 
+#
+# Validation rules shared by the input schemas (see app.validation)
+#
+EMAIL_PATTERN = r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)"
+
+
+def name_rules(label):
+    return [required(f"{label} field is blank."), min_length(3, f"{label} is too short.")]
+
+
+def email_rules(label="Email"):
+    return [required(f"{label} field is blank."), pattern(EMAIL_PATTERN, "Invalid email address.")]
+
+
+PASSWORD_RULES = [
+    required("Password field is blank."),
+    min_length(8, "Password is too short. Must be 8 or more characters"),
+    all_patterns([r"\w*[A-Z]", r"\w*[a-z]", r"\w*[0-9]"], "Password must include an uppercase character, lowercase character, and number."),
+    required("Please enter the password again.", field="confirm_password"),
+    equal_to("confirm_password", "Passwords must match."),
+]
+
+
 #
 # Response representation of a Agent
 #
@@ -90,23 +113,27 @@ class AgentOtpSchema(ma.SQLAlchemyAutoSchema):
     email = fields.String(required=True)
 
     
+    RULES = Rules(
+        email=email_rules(),
+    )
+
     @validates_schema
     def validate_registration(self, data, **kwargs):
-        # Create error
-        userinfo = data
-        valerr = ValidationError({})
-        foundError = False
+        valerr = ValidationError(self.RULES.errors(data))
 
-        if "email" not in userinfo or userinfo["email"] == "":
-            valerr.messages["email"] = "Email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["email"]):
-            valerr.messages["email"] = "Invalid email address."
-            foundError = True
+        if valerr.messages:
+            raise valerr
 
 
-        if foundError:
-            raise valerr
+#
+# Validates a verification code submission.
+#
+class AgentOtpVerificationSchema(AgentOtpSchema):
+    otp = fields.String(required=True)
+
+    RULES = AgentOtpSchema.RULES.extend(
+        otp=[pattern(r"^[0-9]{6}$", "The code must be 6 digits.")],
+    )
 
 
 # Agent request status validation schema
@@ -168,71 +195,39 @@ class AgentRegistrationSchema(ma.SQLAlchemyAutoSchema):
     password = fields.String(required=True)
     confirm_password = fields.String(require=True, load_only=True)
 
+    # Values that must not be registered yet (see app.uniqueness)
+    UNIQUE_RULES = (
+        ("email", AccountDirectory.email, "email", "Email is already registered."),
+    )
+
     class Meta:
         model = Agent
         load_instance = True
 
     
+    RULES = Rules(
+        firstname=name_rules("Firstname"),
+        lastname=name_rules("Lastname"),
+        email=email_rules(),
+        password=PASSWORD_RULES,
+    )
+
     @validates_schema
     def validate_registration(self, data, **kwargs):
-        # Create error
-        userinfo = data
-        valerr = ValidationError({})
-        foundError = False
+        valerr = ValidationError(self.RULES.errors(data))
 
-        if "firstname" not in userinfo or userinfo["firstname"] == "":
-            valerr.messages["firstname"] = "Firstname field is blank."
-            foundError = True
-        elif len(userinfo["firstname"]) < 3:
-            valerr.messages["firstname"] = "Firstname is too short."
-            foundError = True
-
-        if "lastname" not in userinfo or userinfo["lastname"] == "":
-            valerr.messages["lastname"] = "Lastname field is blank."
-            foundError = True
-        elif len(userinfo["lastname"]) < 3:
-            valerr.messages["lastname"] = "Lastname is too short."
-            foundError = True
-
-        if "email" not in userinfo or userinfo["email"] == "":
-            valerr.messages["email"] = "Email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["email"]):
-            valerr.messages["email"] = "Invalid email address."
-            foundError = True
-        
-        else:
-            # Check if email already exists in the database
-            existing_user = Agent.query.filter_by(email=userinfo["email"]).first()
-            if existing_user:
-                valerr.messages["email"] = "Email is already registered."
-                foundError = True
-
-        if "password" not in userinfo or userinfo["password"] == "":
-            valerr.messages["password"] = "Password field is blank."
-            foundError = True
-        elif len(userinfo["password"]) < 8:
-            valerr.messages["password"] = "Password is too short. Must be 8 or more characters"
-            foundError = True
-        elif not (re.match("\w*[A-Z]", userinfo["password"])
-                and re.match("\w*[a-z]", userinfo["password"])
-                and re.match("\w*[0-9]", userinfo["password"])):
-            valerr.messages["password"] = "Password must include an uppercase character, lowercase character, and number."
-            foundError = True
-        elif "confirm_password" not in userinfo or userinfo["confirm_password"] == "":
-            valerr.messages["confirm_password"] = "Please enter the password again."
-            foundError = True
-        elif userinfo["password"] != userinfo["confirm_password"]:
-            valerr.messages["confirm_password"] = "Passwords must match."
-            foundError = True
+        # Already registered values, looked up together in one query
+        check_unique(self.UNIQUE_RULES, data, valerr.messages)
 
-        if foundError:
+        if valerr.messages:
             raise valerr
 
     def load(self, data, *args, **kwargs):
        
         data['is_active'] = False
         data['email'] = data['email'].lower()
+        # Keys are generated per row, never taken from the client
+        data.pop('id', None)
         return super().load(data, *args, **kwargs)
 
 #
@@ -245,87 +240,41 @@ class DistributorRegistrationSchema(ma.SQLAlchemyAutoSchema):
     password = fields.String(required=True)
     confirm_password = fields.String(require=True, load_only=True)
 
+    # Values that must not be registered yet (see app.uniqueness)
+    UNIQUE_RULES = (
+        ("business_name", Distributor.business_name, "email", "Business is already registered."),
+        ("representative_name", Distributor.representative_name, "email", "Representative is already registered."),
+        ("email", AccountDirectory.email, "email", "Email is already registered."),
+    )
+
     class Meta:
         model = Distributor
         load_instance = True
 
     
+    RULES = Rules(
+        business_name=name_rules("Business_name"),
+        representative_name=name_rules("Representative_name"),
+        email=email_rules(),
+        password=PASSWORD_RULES,
+    )
+
     @validates_schema
     def validate_registration(self, data, **kwargs):
-        # Create error
-        userinfo = data
-        valerr = ValidationError({})
-        foundError = False
-
-        if "business_name" not in userinfo or userinfo["business_name"] == "":
-            valerr.messages["business_name"] = "Business_name field is blank."
-            foundError = True
-
-        elif len(userinfo["business_name"]) < 3:
-            valerr.messages["business_name"] = "Business_name is too short."
-            foundError = True
-
-        else:
-            # Check if email already exists in the database
-            existing_dealer = Distributor.query.filter_by(business_name=userinfo["business_name"]).first()
-            if existing_dealer:
-                valerr.messages["email"] = "Business is already registered."
-                foundError = True
-                
-
-        if "representative_name" not in userinfo or userinfo["representative_name"] == "":
-            valerr.messages["representative_name"] = "Representative_name field is blank."
-            foundError = True
-        elif len(userinfo["representative_name"]) < 3:
-            valerr.messages["representative_name"] = "Representative_name is too short."
-            foundError = True
-        
-        else:
-            # Check if email already exists in the database
-            existing_dealer = Distributor.query.filter_by(representative_name=userinfo["representative_name"]).first()
-            if existing_dealer:
-                valerr.messages["email"] = "Representative is already registered."
-                foundError = True
+        valerr = ValidationError(self.RULES.errors(data))
 
-        if "email" not in userinfo or userinfo["email"] == "":
-            valerr.messages["email"] = "Email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["email"]):
-            valerr.messages["email"] = "Invalid email address."
-            foundError = True
-        
-        else:
-            # Check if email already exists in the database
-            existing_dealer = Distributor.query.filter_by(email=userinfo["email"]).first()
-            if existing_dealer:
-                valerr.messages["email"] = "Email is already registered."
-                foundError = True
+        # Already registered values, looked up together in one query
+        check_unique(self.UNIQUE_RULES, data, valerr.messages)
 
-        if "password" not in userinfo or userinfo["password"] == "":
-            valerr.messages["password"] = "Password field is blank."
-            foundError = True
-        elif len(userinfo["password"]) < 8:
-            valerr.messages["password"] = "Password is too short. Must be 8 or more characters"
-            foundError = True
-        elif not (re.match("\w*[A-Z]", userinfo["password"])
-                and re.match("\w*[a-z]", userinfo["password"])
-                and re.match("\w*[0-9]", userinfo["password"])):
-            valerr.messages["password"] = "Password must include an uppercase character, lowercase character, and number."
-            foundError = True
-        elif "confirm_password" not in userinfo or userinfo["confirm_password"] == "":
-            valerr.messages["confirm_password"] = "Please enter the password again."
-            foundError = True
-        elif userinfo["password"] != userinfo["confirm_password"]:
-            valerr.messages["confirm_password"] = "Passwords must match."
-            foundError = True
-
-        if foundError:
+        if valerr.messages:
             raise valerr
 
     def load(self, data, *args, **kwargs):
 
         data['is_active'] = False
         data['email'] = data['email'].lower()
+        # Keys are generated per row, never taken from the client
+        data.pop('id', None)
         return super().load(data, *args, **kwargs)
     
 #
@@ -339,92 +288,39 @@ class InsuranceCompanyRegistrationSchema(ma.SQLAlchemyAutoSchema):
     password = fields.String(required=True)
     confirm_password = fields.String(required=True, load_only=True)
 
+    # Values that must not be registered yet (see app.uniqueness)
+    UNIQUE_RULES = (
+        ("company_name", InsuranceCompany.company_name, "company_name", "Company name is already registered."),
+        ("contact_email", InsuranceCompany.contact_email, "contact_email", "Contact email is already registered."),
+        ("email", AccountDirectory.email, "email", "Email is already registered."),
+    )
+
     class Meta:
         model = InsuranceCompany  # Assuming you have an InsuranceCompany model
         load_instance = True
 
+    RULES = Rules(
+        company_name=name_rules("Company_name"),
+        contact_email=email_rules("Contact_email"),
+        email=email_rules(),
+        contact_phone=[required("Contact_phone field is blank."), min_length(10, "Contact_phone number is too short.")],
+        password=PASSWORD_RULES,
+    )
+
     @validates_schema
     def validate_registration(self, data, **kwargs):
-        # Create error
-        userinfo = data
-        valerr = ValidationError({})
-        foundError = False
+        valerr = ValidationError(self.RULES.errors(data))
 
-        # Validate company_name
-        if "company_name" not in userinfo or userinfo["company_name"] == "":
-            valerr.messages["company_name"] = "Company_name field is blank."
-            foundError = True
-        elif len(userinfo["company_name"]) < 3:
-            valerr.messages["company_name"] = "Company_name is too short."
-            foundError = True
-        else:
-            # Check if company_name already exists in the database
-            existing_company = InsuranceCompany.query.filter_by(company_name=userinfo["company_name"]).first()
-            if existing_company:
-                valerr.messages["company_name"] = "Company name is already registered."
-                foundError = True
-
-        # Validate contact_email
-        if "contact_email" not in userinfo or userinfo["contact_email"] == "":
-            valerr.messages["contact_email"] = "Contact_email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["contact_email"]):
-            valerr.messages["contact_email"] = "Invalid email address."
-            foundError = True
-        else:
-            # Check if contact_email already exists in the database
-            existing_company = InsuranceCompany.query.filter_by(contact_email=userinfo["contact_email"]).first()
-            if existing_company:
-                valerr.messages["contact_email"] = "Contact email is already registered."
-                foundError = True
-
-        # Validate email
-        if "email" not in userinfo or userinfo["email"] == "":
-            valerr.messages["email"] = "Email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["email"]):
-            valerr.messages["email"] = "Invalid email address."
-            foundError = True
-        else:
-            # Check if email already exists in the database
-            existing_company = InsuranceCompany.query.filter_by(email=userinfo["email"]).first()
-            if existing_company:
-                valerr.messages["email"] = "Email is already registered."
-                foundError = True
-
-        # Validate contact_phone
-        if "contact_phone" not in userinfo or userinfo["contact_phone"] == "":
-            valerr.messages["contact_phone"] = "Contact_phone field is blank."
-            foundError = True
-        elif len(userinfo["contact_phone"]) < 10:
-            valerr.messages["contact_phone"] = "Contact_phone number is too short."
-            foundError = True
+        # Already registered values, looked up together in one query
+        check_unique(self.UNIQUE_RULES, data, valerr.messages)
 
-        # Validate password
-        if "password" not in userinfo or userinfo["password"] == "":
-            valerr.messages["password"] = "Password field is blank."
-            foundError = True
-        elif len(userinfo["password"]) < 8:
-            valerr.messages["password"] = "Password is too short. Must be 8 or more characters"
-            foundError = True
-        elif not (re.match("\w*[A-Z]", userinfo["password"])
-                and re.match("\w*[a-z]", userinfo["password"])
-                and re.match("\w*[0-9]", userinfo["password"])):
-            valerr.messages["password"] = "Password must include an uppercase character, lowercase character, and number."
-            foundError = True
-        elif "confirm_password" not in userinfo or userinfo["confirm_password"] == "":
-            valerr.messages["confirm_password"] = "Please enter the password again."
-            foundError = True
-        elif userinfo["password"] != userinfo["confirm_password"]:
-            valerr.messages["confirm_password"] = "Passwords must match."
-            foundError = True
-
-        if foundError:
+        if valerr.messages:
             raise valerr
 
     def load(self, data, *args, **kwargs):
         data['is_active'] = False  # Default value for the new insurance company
         data['email'] = data['email'].lower()  # Store email in lowercase
+        data.pop('id', None)  # Keys are generated per row, never taken from the client
         return super().load(data, *args, **kwargs)
 
 
@@ -454,17 +350,9 @@ class AgentLoginSchema(ma.SQLAlchemyAutoSchema):
         if "email" not in userinfo or userinfo["email"] == "":
             valerr.messages["email"] = "Email is required"
             foundError = True
-        else:
-            # Check if email exists in the database
-            existing_user = Agent.query.filter_by(email=userinfo["email"]).first()
-            if not existing_user:
-                valerr.messages["email"] = "Invalid email or password"
-                foundError = True
-            else:
-                # Email exists, now check the password
-                if not check_password_hash(existing_user.password, userinfo["password"]):
-                    valerr.messages["password"] = "Invalid email or password"
-                    foundError = True
+
+        # The credentials themselves are checked by authentication_service.loginUser,
+        # which loads the account once and issues the tokens from that row.
 
         if foundError:
             raise valerr
@@ -486,49 +374,20 @@ class PurchaseRegistrationSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
 
     
+    RULES = Rules(
+        firstname=name_rules("Firstname"),
+        lastname=name_rules("Lastname"),
+        email=email_rules(),
+        product_category=[required("Product_category field is blank.")],
+        product=[required("Product field is blank.")],
+        phone_number=[required("Phone Number field is blank.")],
+    )
+
     @validates_schema
     def validate_purchase(self, data, **kwargs):
-        # Create error
-        userinfo = data
-        valerr = ValidationError({})
-        foundError = False
-
-        if "firstname" not in userinfo or userinfo["firstname"] == "":
-            valerr.messages["firstname"] = "Firstname field is blank."
-            foundError = True
-        elif len(userinfo["firstname"]) < 3:
-            valerr.messages["firstname"] = "Firstname is too short."
-            foundError = True
-
-        if "lastname" not in userinfo or userinfo["lastname"] == "":
-            valerr.messages["lastname"] = "Lastname field is blank."
-            foundError = True
-        elif len(userinfo["lastname"]) < 3:
-            valerr.messages["lastname"] = "Lastname is too short."
-            foundError = True
-
-        if "email" not in userinfo or userinfo["email"] == "":
-            valerr.messages["email"] = "Email field is blank."
-            foundError = True
-        elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", userinfo["email"]):
-            valerr.messages["email"] = "Invalid email address."
-            foundError = True
-        
-
-        if "product_category" not in userinfo or userinfo["product_category"] == "":
-            valerr.messages["product_category"] = "Product_category field is blank."
-            foundError = True
-
-        if "product" not in userinfo or userinfo["product"] == "":
-            valerr.messages["product"] = "Product field is blank."
-            foundError = True
+        valerr = ValidationError(self.RULES.errors(data))
 
-        if "phone_number" not in userinfo or userinfo["phone_number"] == "":
-            valerr.messages["phone_number"] = "Phone Number field is blank."
-            foundError = True
-       
-
-        if foundError:
+        if valerr.messages:
             raise valerr
 
     # def load(self, data, *args, **kwargs):
@@ -0,0 +1,131 @@
+import keyword
+from collections.abc import Mapping
+from functools import lru_cache
+from datetime import date, datetime
+
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+#
+# Compile a marshmallow schema instance into a specialized dump function.
+#
+# The returned dump(obj, many=None) produces exactly what schema.dump would.
+# Attribute reads are generated as plain Python source, and String, Integer,
+# Boolean, DateTime and Date values that need no conversion skip the field
+# machinery. Other fields go through field.serialize as usual, nested schemas
+# are compiled on first use, and anything unusual (dump hooks, a custom
+# get_attribute, dict input) falls back to schema.dump.
+#
+def compile_schema(schema):
+    if schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP] or type(schema).get_attribute is not Schema.get_attribute:
+        return schema.dump
+
+    dump_one = _compile_one(schema)
+    default_many = schema.many
+
+    def dump_item(item):
+        if isinstance(item, Mapping):
+            return schema.dump(item, many=False)
+        try:
+            return dump_one(item)
+        except AttributeError:
+            # marshmallow leaves attributes the object lacks out of the output
+            return schema.dump(item, many=False)
+
+    def dump(obj, many=None):
+        many = default_many if many is None else bool(many)
+
+        if obj is None:
+            return schema.dump(obj, many=many)
+
+        if many:
+            return [dump_item(item) for item in obj]
+
+        return dump_item(obj)
+
+    return dump
+
+
+#
+# Compiled many=True dump of a schema class, optionally restricted to `only`
+# (a tuple of field names). Compiled once per distinct field set.
+#
+@lru_cache(maxsize=128)
+def compiled_dump(schema_class, only=None):
+    return compile_schema(schema_class(many=True, only=only))
+
+
+# Source of the expression serializing one field; "{get}" reads the attribute
+# and "{convert}" is the field's own conversion for values off the fast path.
+_FAST_PATHS = {
+    'string': "(_v if (_v := {get}) is None or _v.__class__ is str else {convert}(_v))",
+    'integer': "(_v if (_v := {get}) is None or _v.__class__ is int else {convert}(_v))",
+    'boolean': "(_v if (_v := {get}) is None or _v is True or _v is False else {convert}(_v))",
+    'datetime': "(None if (_v := {get}) is None else _v.isoformat() if _v.__class__ is _datetime else {convert}(_v))",
+    'date': "(None if (_v := {get}) is None else _v.isoformat() if _v.__class__ is _date else {convert}(_v))",
+    'nested': "{convert}({get})",
+}
+
+
+def _kind(field):
+    serialize = type(field)._serialize
+
+    if serialize is fields.String._serialize:
+        return 'string'
+    if serialize is fields.Number._serialize and field.num_type is int and not field.as_string:
+        return 'integer'
+    if serialize is fields.Boolean._serialize and True in field.truthy and False in field.falsy:
+        return 'boolean'
+    if serialize is fields.DateTime._serialize and (field.format or field.DEFAULT_FORMAT) == 'iso':
+        return 'date' if isinstance(field, fields.Date) else 'datetime'
+    if serialize is fields.Nested._serialize:
+        return 'nested'
+    return None
+
+
+def _nested_converter(field):
+    compiled = []
+
+    def convert(value):
+        if value is None:
+            return None
+        if not compiled:
+            compiled.append(compile_schema(field.schema))
+        return compiled[0](value, many=field.schema.many or field.many)
+
+    return convert
+
+
+def _field_converter(field, name):
+    return lambda value: field._serialize(value, name, None)
+
+
+def _compile_one(schema):
+    namespace = {'_datetime': datetime, '_date': date, '_missing': missing}
+    entries = []
+    optional = []
+
+    for position, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        kind = _kind(field)
+        converter = 'c%d' % position
+
+        if kind is None or not attribute.isidentifier() or keyword.iskeyword(attribute) or not field._CHECK_ATTRIBUTE:
+            # Regular marshmallow path; the value may come back missing
+            namespace[converter] = lambda obj, field=field, name=name: field.serialize(name, obj, accessor=schema.get_attribute)
+            entries.append(f"{key!r}: {converter}(obj)")
+            optional.append(key)
+            continue
+
+        namespace[converter] = _nested_converter(field) if kind == 'nested' else _field_converter(field, name)
+        entries.append(f"{key!r}: " + _FAST_PATHS[kind].format(get=f"obj.{attribute}", convert=converter))
+
+    body = ["def dump_one(obj):", "    result = {", *(f"        {entry}," for entry in entries), "    }"]
+    for key in optional:
+        body.append(f"    if result[{key!r}] is _missing: del result[{key!r}]")
+    body.append("    return result")
+
+    exec(compile("\n".join(body), f"<compiled {type(schema).__name__}>", "exec"), namespace)
+    return namespace['dump_one']
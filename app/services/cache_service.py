@@ -0,0 +1,272 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import redis
+except ImportError:  # optional, only needed for CACHE_BACKEND = "redis"
+    redis = None
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # Kept out of the LRU: losing a version would resurrect stale entries
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def versions(self, tables):
+        return [self._versions.get(table, 0) for table in tables]
+
+    def bump(self, table):
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def size(self):
+        return len(self._entries)
+
+
+class LocalSharedClient:
+    """
+    In-process stand-in for the subset of the redis-py client the shared
+    backend uses. Lets the shared code path run in development and tests
+    without a server.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def mget(self, keys):
+        with self._lock:
+            return [entry[0] if entry else None for entry in map(self._live, keys)]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key):
+        with self._lock:
+            entry = self._live(key)
+            value = int(entry[0]) + 1 if entry else 1
+            self._data[key] = (str(value).encode(), entry[1] if entry else None)
+            return value
+
+    def dbsize(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SharedBackend:
+    """Cache shared by every worker, stored in Redis or a LocalSharedClient."""
+
+    name = 'shared'
+
+    def __init__(self, client, prefix='cache:'):
+        self.client = client
+        self.prefix = prefix
+        # Eviction happens on the server and isn't visible to the workers
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def versions(self, tables):
+        values = self.client.mget([self.prefix + 'table:' + table for table in tables])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, table):
+        self.client.incr(self.prefix + 'table:' + table)
+
+    def size(self):
+        return self.client.dbsize()
+
+
+class ResponseCache:
+    """
+    Caches GET responses of views that declare which tables they read.
+
+    Entries are keyed on the request path, query string and the current
+    version of every table the view depends on. Committing a session that
+    inserted, updated or deleted rows of a table bumps that table's version,
+    so every cached response built from it is skipped from then on. A miss
+    runs the view against the primary (see ReplicaRouter), so what gets
+    stored under the new versions includes the write that bumped them.
+    """
+
+    def __init__(self, application=None):
+        self.backend = None
+        self.default_ttl = 300
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application):
+        config = application.config
+        self.default_ttl = config.get('CACHE_DEFAULT_TTL', 300)
+        backend = config.get('CACHE_BACKEND', 'memory')
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(config.get('CACHE_MAX_ENTRIES', 1024))
+        elif backend == 'local':
+            self.backend = SharedBackend(LocalSharedClient())
+        elif backend == 'redis':
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND is 'redis' but the redis package is not installed.")
+            self.backend = SharedBackend(redis.Redis.from_url(config['CACHE_REDIS_URL']))
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+
+        _listen_for_writes()
+        application.extensions['response_cache'] = self
+
+    def invalidate(self, tables):
+        for table in tables:
+            self.backend.bump(table)
+
+    def _count(self, hit):
+        with self._counter_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._counter_lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.backend.evictions,
+            "entries": self.backend.size(),
+        }
+
+    def cached(self, tables, ttl=None):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                versions = self.backend.versions(tables)
+                key = 'view:' + request.full_path + '|' + ','.join(map(str, versions))
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._count(True)
+                    body, status, mimetype = entry
+                    response = current_app.response_class(body, status=status, mimetype=mimetype)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._count(False)
+                # A lagging replica could miss the write that bumped the versions,
+                # and its stale body would then be served under the new key
+                g.db_read_primary = True
+                response = make_response(view(*args, **kwargs))
+
+                if response.status_code == 200 and not response.is_streamed:
+                    self.backend.set(key, (response.get_data(), response.status_code, response.mimetype), ttl or self.default_ttl)
+
+                response.headers['X-Cache'] = 'MISS'
+                return response
+
+            return wrapper
+
+        return decorator
+
+
+#
+# Track the tables each session writes to and invalidate them once it commits.
+#
+_listening = False
+
+
+def _listen_for_writes():
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    @event.listens_for(Session, 'after_flush')
+    def _collect_flushed_tables(session, flush_context):
+        tables = session.info.setdefault('written_tables', set())
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            table = getattr(type(instance), '__tablename__', None)
+            if table:
+                tables.add(table)
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _collect_statement_tables(orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE statements bypass the unit of work
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = orm_execute_state.statement.table
+            orm_execute_state.session.info.setdefault('written_tables', set()).add(table.name)
+
+    @event.listens_for(Session, 'after_commit')
+    def _invalidate_written_tables(session):
+        tables = session.info.pop('written_tables', None)
+        if tables and has_app_context():
+            cache = current_app.extensions.get('response_cache')
+            if cache is not None:
+                cache.invalidate(tables)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _forget_written_tables(session):
+        session.info.pop('written_tables', None)
@@ -0,0 +1,143 @@
+import abc
+import logging
+import queue
+import random
+import threading
+from collections import deque
+
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.utils import import_string
+
+
+class DeliveryQueueFull(ServiceUnavailable):
+    description = "Too many messages waiting to be sent. Please retry shortly."
+
+
+class MessageProvider(abc.ABC):
+    """
+    Sends one message to one recipient (an email address or phone number).
+    Raise any exception to have the delivery retried.
+    """
+
+    @abc.abstractmethod
+    def send(self, recipient, subject, body):
+        """Deliver the message, or raise."""
+
+
+class LocalProvider(MessageProvider):
+    """Keeps sent messages in memory and logs them, for development and tests."""
+
+    def __init__(self, max_messages=100):
+        self.outbox = deque(maxlen=max_messages)
+
+    def send(self, recipient, subject, body):
+        self.outbox.append({"recipient": recipient, "subject": subject, "body": body})
+        logging.getLogger(__name__).info("message: \"%s\", recipient: \"%s\"", subject, recipient)
+
+
+class DeliveryQueue:
+    """
+    Hands messages to a MessageProvider from background worker threads, so
+    requests only pay for putting the message on an in-process queue.
+
+    Failed deliveries are retried up to DELIVERY_MAX_ATTEMPTS times with
+    exponential backoff and jitter. Workers start with the first message.
+    """
+
+    def __init__(self, application=None):
+        self.provider = None
+        self._queue = None
+        self._workers = []
+        self._start_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._reset_counters()
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application, provider=None):
+        config = application.config
+        self.worker_count = config.get('DELIVERY_WORKERS', 2)
+        self.max_attempts = config.get('DELIVERY_MAX_ATTEMPTS', 5)
+        self.backoff = config.get('DELIVERY_BACKOFF_SECONDS', 1.0)
+        self.logger = application.logger
+
+        if provider is None:
+            provider = import_string(config.get('DELIVERY_PROVIDER', 'app.services.delivery_service.LocalProvider'))()
+        self.provider = provider
+
+        self._queue = queue.Queue(maxsize=config.get('DELIVERY_MAX_QUEUE', 1000))
+        application.extensions['delivery_queue'] = self
+
+    def _reset_counters(self):
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def _start_workers(self):
+        with self._start_lock:
+            if self._workers:
+                return
+            for number in range(self.worker_count):
+                worker = threading.Thread(target=self._work, name=f'delivery-{number}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def ensure_capacity(self):
+        """Refuse work up front (e.g. before storing a code) that enqueue() would refuse later."""
+        if self._queue.full():
+            raise DeliveryQueueFull(retry_after=1)
+
+    def enqueue(self, recipient, subject, body):
+        if not self._workers:
+            self._start_workers()
+        try:
+            self._queue.put_nowait((recipient, subject, body, 1))
+        except queue.Full:
+            raise DeliveryQueueFull(retry_after=1)
+
+    def _work(self):
+        while True:
+            recipient, subject, body, attempt = self._queue.get()
+            try:
+                self.provider.send(recipient, subject, body)
+                self._count('sent')
+            except Exception as error:
+                self._retry_later(recipient, subject, body, attempt, error)
+            finally:
+                self._queue.task_done()
+
+    def _count(self, counter):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _retry_later(self, recipient, subject, body, attempt, error):
+        if attempt >= self.max_attempts:
+            self._count('failed')
+            self.logger.error("message: \"delivery failed\", subject: \"{}\", attempts: {}, reason: \"{}\"".format(subject, attempt, error))
+            return
+
+        self._count('retried')
+        delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+        # Waiting on a timer keeps the workers free for other messages
+        timer = threading.Timer(delay, self._requeue, (recipient, subject, body, attempt + 1))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue(self, recipient, subject, body, attempt):
+        try:
+            self._queue.put_nowait((recipient, subject, body, attempt))
+        except queue.Full:
+            self._count('failed')
+            self.logger.error("message: \"delivery dropped\", subject: \"{}\", reason: \"queue full\"".format(subject))
+
+    def join(self):
+        """Block until every queued message was handled (retries still waiting on a timer excluded)."""
+        self._queue.join()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import ServiceUnavailable
+
+from app.services.metrics import Histogram
+
+
+class HashingPoolSaturated(ServiceUnavailable):
+    description = "Too many sign-ins and sign-ups in progress. Please retry shortly."
+
+
+class HashingPool:
+    """
+    Runs password hashing and verification on a dedicated, bounded thread pool.
+
+    The calling request thread still waits for its result; what the pool
+    bounds is how many hashes run at once. At most HASHING_POOL_WORKERS jobs
+    run, so a burst of sign-ins can't take every core from the rest of the
+    API, and HASHING_POOL_MAX_QUEUE wait; anything beyond that is rejected
+    at once with 503 instead of tying up another request thread in the queue.
+    """
+
+    def __init__(self, application=None):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.workers = 0
+        self.max_queue = 0
+        self._reset_metrics()
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application):
+        config = application.config
+        self.workers = config.get('HASHING_POOL_WORKERS') or min(4, os.cpu_count() or 1)
+        self.max_queue = config.get('HASHING_POOL_MAX_QUEUE', 32)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        application.extensions['hashing_pool'] = self
+
+    def _reset_metrics(self):
+        self.submitted = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.wait = Histogram()
+        self.compute = Histogram()
+
+    def run(self, function, *args):
+        # Not initialized (scripts, shell): hash on the calling thread
+        if self._executor is None:
+            return function(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingPoolSaturated(retry_after=1)
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.wait.observe((started - submitted) * 1000)
+                    self.compute.observe((finished - started) * 1000)
+
+        try:
+            return self._executor.submit(job).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "wait_ms": self.wait.as_dict(),
+                "compute_ms": self.compute.as_dict(),
+            }
@@ -0,0 +1,127 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.services.cache_service import MemoryBackend
+
+
+class IdentityCache:
+    """
+    Resolves the account behind a JWT identity ({"email", "role"}) for
+    flask_jwt_extended's user lookup loader. Identities of staff roles have
+    no account and resolve to themselves.
+
+    Column values of resolved accounts are kept per process for
+    IDENTITY_CACHE_TTL seconds and rebuilt into session-bound instances
+    without a query. Committing a change to an account drops its entry.
+    flask_jwt_extended already keeps the loaded user for the rest of the
+    request, so `current_user` costs nothing after the first access.
+    """
+
+    def __init__(self, application=None):
+        self.models_by_role = {}
+        self.staff_roles = set()
+        self.backend = None
+        self.ttl = 60
+        self.hits = 0
+        self.misses = 0
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application, jwt=None, models_by_role=None, staff_roles=()):
+        config = application.config
+        self.ttl = config.get('IDENTITY_CACHE_TTL', 60)
+        self.backend = MemoryBackend(config.get('IDENTITY_CACHE_MAX_ENTRIES', 4096))
+        self.models_by_role = models_by_role or {}
+        self.staff_roles = set(staff_roles)
+
+        if jwt is not None:
+            jwt.user_lookup_loader(lambda _jwt_header, jwt_data: self.lookup(jwt_data['sub']))
+
+        _listen_for_account_changes(self)
+        application.extensions['identity_cache'] = self
+
+    def _candidates(self, role):
+        model = self.models_by_role.get(role)
+        if model is not None:
+            return [model]
+        # Unknown or missing role (e.g. bare email identities): try every account table
+        return list(dict.fromkeys(self.models_by_role.values()))
+
+    def lookup(self, identity):
+        from app.extensions import db
+
+        if isinstance(identity, dict):
+            email, role = identity.get('email'), identity.get('role')
+        else:
+            email, role = identity, None
+
+        if not email:
+            return None
+
+        # Staff tokens have no account row; the identity itself is the user
+        if role in self.staff_roles:
+            return identity
+
+        for model in self._candidates(role):
+            key = model.__tablename__ + ':' + email
+            values = self.backend.get(key)
+
+            if values is not None:
+                self.hits += 1
+                account = model(**values)
+                make_transient_to_detached(account)
+                return db.session.merge(account, load=False)
+
+            self.misses += 1
+            account = model.get_user_by_email(email)
+            if account is not None:
+                self.backend.set(key, _column_values(account), self.ttl)
+                return account
+
+        return None
+
+    def invalidate(self, table, email):
+        self.backend.delete(table + ':' + email)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": self.backend.size()}
+
+
+def _column_values(instance):
+    return {attribute.key: getattr(instance, attribute.key) for attribute in inspect(type(instance)).column_attrs}
+
+
+#
+# Collect the emails of accounts updated or deleted by a session and drop
+# them from the cache once it commits.
+#
+_listening = False
+
+
+def _listen_for_account_changes(cache):
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    def _mark_stale(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is None:
+            return
+        # Both the old and the new address when the email itself changed
+        history = inspect(target).attrs.email.history
+        emails = {target.email, *history.deleted}
+        session.info.setdefault('stale_identities', set()).update((mapper.local_table.name, email) for email in emails if email)
+
+    for model in set(cache.models_by_role.values()):
+        event.listen(model, 'after_update', _mark_stale)
+        event.listen(model, 'after_delete', _mark_stale)
+
+    @event.listens_for(Session, 'after_commit')
+    def _drop_stale_identities(session):
+        for table, email in session.info.pop('stale_identities', ()):
+            cache.invalidate(table, email)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _forget_stale_identities(session):
+        session.info.pop('stale_identities', None)
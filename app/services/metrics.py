@@ -0,0 +1,23 @@
+from bisect import bisect_left
+
+
+# Upper bounds, in milliseconds, of the duration histogram buckets
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Counts of observed durations per bucket; callers serialize access."""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+
+    def as_dict(self):
+        buckets = {f"le_{bound}": count for bound, count in zip(HISTOGRAM_BUCKETS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        observed = sum(self.counts)
+        return {"buckets": buckets, "count": observed, "avg_ms": self.total_ms / observed if observed else 0.0}
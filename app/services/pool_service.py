@@ -0,0 +1,81 @@
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.services.metrics import Histogram
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.wait = Histogram()
+        self.timeouts = 0
+        # New DBAPI connections, including reconnects after pre-ping or recycle
+        self.connects = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                self.wait.observe((time.perf_counter() - started) * 1000)
+
+    def _create_connection(self):
+        with self._metrics_lock:
+            self.connects += 1
+        return super()._create_connection()
+
+    def stats(self):
+        with self._metrics_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": self.wait.as_dict(),
+            }
+
+
+#
+# SQLALCHEMY_ENGINE_OPTIONS for the DB_POOL_* settings, for the primary or
+# another database `url` (e.g. a read replica).
+#
+# SQLite gets no pool sizing: in-memory databases use one static connection
+# and file databases don't need more than SQLAlchemy's defaults.
+#
+def pool_options(config, url=None):
+    options = {
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+    }
+
+    if make_url(url or config['SQLALCHEMY_DATABASE_URI']).get_backend_name() != 'sqlite':
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=config.get('DB_POOL_SIZE', 10),
+            max_overflow=config.get('DB_POOL_MAX_OVERFLOW', 20),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 10),
+        )
+
+    return options
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__, **pool.stats()}
+    return {"pool": type(pool).__name__, "status": pool.status()}
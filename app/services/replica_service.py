@@ -0,0 +1,267 @@
+import itertools
+import sqlite3
+import threading
+import time
+
+import click
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask.cli import with_appcontext
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.services.pool_service import pool_options, pool_stats
+
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+def _is_read(clause):
+    # Plain SELECTs only: text() and SELECT ... FOR UPDATE stay on the primary
+    return isinstance(clause, sa.Select) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """
+    db.session class that sends the SELECTs of read-only requests to a
+    replica (see ReplicaRouter). Everything else, flushes included, uses
+    the bind Flask-SQLAlchemy would pick anyway.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _is_read(clause):
+            router = current_app.extensions.get('replica_router')
+            engine = router.read_engine() if router is not None else None
+            if engine is not None:
+                return engine
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of GET, HEAD and OPTIONS requests to the databases in
+    DB_REPLICA_URIS, round robin. Writes, and every query outside a request
+    (CLI commands, background workers), go to the primary.
+
+    Read-your-writes: once a request flushes a change, the rest of it reads
+    from the primary, and the response sets a cookie that keeps the client's
+    reads on the primary for DB_REPLICA_STICKY_SECONDS, longer than the
+    replicas are expected to lag. Requests that set g.db_read_primary, like
+    the ones filling ResponseCache, read from the primary too.
+
+    A replica is probed with SELECT 1 at most every
+    DB_REPLICA_HEALTH_CHECK_SECONDS, on a background thread: requests route
+    on the last known state and never wait for a probe. One that fails the
+    probe, or drops a connection, is skipped for DB_REPLICA_RETRY_SECONDS;
+    with no healthy replica left reads fall back to the primary. Connecting
+    to a replica gives up after DB_REPLICA_CONNECT_TIMEOUT seconds, so one
+    that hangs is found out quickly.
+    """
+
+    cookie_name = 'db_primary_until'
+
+    def __init__(self, application=None):
+        self.engines = {}
+        self.keys = []
+        self.sticky_seconds = 10
+        self.check_interval = 5
+        self.retry_interval = 30
+        self.connect_timeout = 2
+        self._reset()
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application):
+        config = application.config
+        self.sticky_seconds = config.get('DB_REPLICA_STICKY_SECONDS', 10)
+        self.check_interval = config.get('DB_REPLICA_HEALTH_CHECK_SECONDS', 5)
+        self.retry_interval = config.get('DB_REPLICA_RETRY_SECONDS', 30)
+        self.connect_timeout = config.get('DB_REPLICA_CONNECT_TIMEOUT', 2)
+        self.logger = application.logger
+        self._reset()
+
+        # Engines of their own rather than SQLALCHEMY_BINDS: no model lives on a
+        # replica, so create_all and migrations must not see them
+        self.engines = {}
+        for number, uri in enumerate(config.get('DB_REPLICA_URIS') or (), start=1):
+            engine = sa.create_engine(uri, **self._engine_options(config, uri))
+            key = f'replica_{number}'
+            event.listen(engine, 'handle_error', lambda context, key=key: self._on_error(key, context))
+            self.engines[key] = engine
+        self.keys = list(self.engines)
+
+        if self.keys:
+            application.after_request(self._stick_to_primary)
+        _listen_for_writes()
+        application.cli.add_command(sync_replicas)
+        application.extensions['replica_router'] = self
+
+    def _engine_options(self, config, uri):
+        options = pool_options(config, uri)
+        # SQLite has no connect timeout to set (its "timeout" waits for locks)
+        if make_url(uri).get_backend_name() != 'sqlite':
+            options['connect_args'] = {'connect_timeout': self.connect_timeout, **options.get('connect_args', {})}
+        return options
+
+    def _reset(self):
+        # key -> (healthy, monotonic time of the next probe)
+        self._health = {}
+        # keys with a probe running
+        self._probing = set()
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.replica_reads = {}
+        self.primary_reads = 0
+
+    #
+    # Routing
+    #
+    def read_engine(self):
+        if not self.keys or not has_request_context() or request.method not in READ_METHODS:
+            return None
+
+        if g.get('db_wrote') or g.get('db_read_primary') or self._sticky():
+            self._count_read(None)
+            return None
+
+        for _ in range(len(self.keys)):
+            key = self.keys[next(self._turn) % len(self.keys)]
+            if self._healthy(key):
+                self._count_read(key)
+                return self.engines[key]
+
+        self._count_read(None)
+        return None
+
+    def _count_read(self, key):
+        with self._counter_lock:
+            if key is None:
+                self.primary_reads += 1
+            else:
+                self.replica_reads[key] = self.replica_reads.get(key, 0) + 1
+
+    def _sticky(self):
+        try:
+            return float(request.cookies.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _stick_to_primary(self, response):
+        if g.get('db_wrote'):
+            response.set_cookie(self.cookie_name, str(time.time() + self.sticky_seconds),
+                                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+    #
+    # Health
+    #
+    def _healthy(self, key):
+        healthy, next_check = self._health.get(key, (True, 0.0))
+        if time.monotonic() >= next_check:
+            self._start_probe(key)
+        return healthy
+
+    def _start_probe(self, key):
+        with self._lock:
+            if key in self._probing:
+                return
+            self._probing.add(key)
+        threading.Thread(target=self._probe, args=(key,), name=f'probe-{key}', daemon=True).start()
+
+    def _probe(self, key):
+        try:
+            with self.engines[key].connect() as connection:
+                connection.exec_driver_sql('SELECT 1')
+        except Exception as err:
+            self._mark_down(key, err)
+        else:
+            with self._lock:
+                self._health[key] = (True, time.monotonic() + self.check_interval)
+        finally:
+            with self._lock:
+                self._probing.discard(key)
+
+    def _on_error(self, key, context):
+        if context.is_disconnect or context.connection is None:
+            self._mark_down(key, context.original_exception)
+
+    def _mark_down(self, key, err):
+        with self._lock:
+            was_healthy = self._health.get(key, (True,))[0]
+            self._health[key] = (False, time.monotonic() + self.retry_interval)
+        if was_healthy:
+            self.logger.warning(f"Replica {key} is unavailable, reading from the primary: {err}")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._counter_lock:
+            primary_reads, replica_reads = self.primary_reads, dict(self.replica_reads)
+        return {
+            "primary_reads": primary_reads,
+            "replicas": {
+                key: {
+                    "healthy": self._health.get(key, (True, now))[0],
+                    "reads": replica_reads.get(key, 0),
+                    **pool_stats(self.engines[key]),
+                }
+                for key in self.keys
+            },
+        }
+
+
+#
+# Flag requests that wrote, so their later reads and the client's next ones use the primary.
+#
+_listening = False
+
+
+def _listen_for_writes():
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    def _wrote():
+        if has_request_context():
+            g.db_wrote = True
+
+    @event.listens_for(RoutingSession, 'after_flush')
+    def _flushed(session, flush_context):
+        _wrote()
+
+    @event.listens_for(RoutingSession, 'do_orm_execute')
+    def _executed(orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+        if not orm_execute_state.is_select:
+            _wrote()
+
+
+#
+# CLI: copy a SQLite primary into SQLite replicas, for trying replicas locally
+#
+@click.command('sync-replicas')
+@with_appcontext
+def sync_replicas():
+    config = current_app.config
+    primary = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    replicas = [make_url(uri) for uri in config.get('DB_REPLICA_URIS') or ()]
+
+    if not replicas:
+        raise click.ClickException("DB_REPLICA_URIS is empty.")
+    if any(url.get_backend_name() != 'sqlite' or not url.database for url in (primary, *replicas)):
+        raise click.ClickException("Only SQLite file databases can be copied; other servers replicate themselves.")
+
+    source = sqlite3.connect(primary.database)
+    try:
+        for url in replicas:
+            target = sqlite3.connect(url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+            click.echo(f"Copied {primary.database} to {url.database}.")
+    finally:
+        source.close()
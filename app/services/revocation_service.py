@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+# Revocations are re-read this far back on every refresh, so rows committed
+# late by another worker, or stamped by a slightly different clock, still arrive
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def _email_of(identity):
+    return identity.get('email') if isinstance(identity, dict) else identity
+
+
+def _timestamp(moment):
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """
+    flask_jwt_extended blocklist backed by the token_revocation table.
+
+    Every worker keeps the unexpired revocations in memory: a dict of revoked
+    JTIs and a dict of "revoked before" cutoffs per account, so checking a
+    token is a couple of hash lookups. The table is re-read at most every
+    REVOCATION_REFRESH_SECONDS and only for rows added since the last read.
+    Revocations made by this worker apply immediately; those made by others
+    within one refresh interval.
+    """
+
+    def __init__(self, application=None):
+        self.model = None
+        self.refresh_interval = 5
+        self._reset()
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application, jwt=None, model=None):
+        self.model = model
+        self.refresh_interval = application.config.get('REVOCATION_REFRESH_SECONDS', 5)
+        self._reset()
+
+        if jwt is not None:
+            jwt.token_in_blocklist_loader(lambda _jwt_header, jwt_payload: self.is_revoked(jwt_payload))
+
+        application.extensions['revocation_list'] = self
+
+    def _reset(self):
+        # jti -> expiry timestamp
+        self._jtis = {}
+        # email -> (cutoff timestamp, expiry timestamp)
+        self._cutoffs = {}
+        self._since = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+        # Writers only; readers use whichever dicts are current
+        self._write_lock = threading.Lock()
+
+    def _remember(self, row):
+        expires = _timestamp(row.expires)
+        with self._write_lock:
+            if row.jti:
+                self._jtis[row.jti] = expires
+            if row.revoked_before is not None:
+                cutoff = _timestamp(row.revoked_before)
+                current = self._cutoffs.get(row.email)
+                if current is None or current[0] < cutoff:
+                    self._cutoffs[row.email] = (cutoff, expires)
+
+    def _forget_expired(self):
+        now = time.time()
+        with self._write_lock:
+            self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+            self._cutoffs = {email: entry for email, entry in self._cutoffs.items() if entry[1] > now}
+
+    def refresh(self):
+        started = datetime.utcnow()
+        for row in self.model.active(self._since):
+            self._remember(row)
+        self._forget_expired()
+        self._since = started - REFRESH_OVERLAP
+
+    def _refresh_if_due(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        # One thread refreshes; the others keep checking against the current sets
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() >= self._next_refresh:
+                self.refresh()
+                self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jwt_payload):
+        self._refresh_if_due()
+
+        if jwt_payload.get('jti') in self._jtis:
+            return True
+
+        # Cutoffs are whole seconds, like iat: tokens of the cutoff's second stay valid
+        cutoff = self._cutoffs.get(_email_of(jwt_payload.get('sub')))
+        return cutoff is not None and jwt_payload.get('iat', 0) < cutoff[0]
+
+    def revoke(self, jwt_payload):
+        """Revoke one token."""
+        row = self.model(
+            jti=jwt_payload['jti'],
+            email=_email_of(jwt_payload.get('sub')),
+            expires=datetime.utcfromtimestamp(jwt_payload['exp']),
+        )
+        row.save()
+        self._remember(row)
+
+    def revoke_all(self, email, lifetime, current=None):
+        """
+        Revoke every token of an account issued before the current second, and
+        `current` (the payload of the token asking for it) by its JTI; tokens
+        issued later within the second, e.g. by logging in again, stay valid.
+        `lifetime` is the longest token lifetime.
+        """
+        # iat has whole seconds, and so has a MySQL DATETIME
+        now = datetime.utcnow().replace(microsecond=0)
+        row = self.model(email=email, revoked_before=now, expires=now + lifetime)
+        row.save()
+        self._remember(row)
+        if current is not None:
+            self.revoke(current)
+
+    def stats(self):
+        return {"revoked_tokens": len(self._jtis), "revoked_accounts": len(self._cutoffs)}
@@ -0,0 +1,197 @@
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from jwt.exceptions import InvalidSignatureError
+
+
+ASYMMETRIC_ALGORITHMS = ('RS256', 'EdDSA')
+
+
+def generate_private_key(algorithm):
+    if algorithm == 'RS256':
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == 'EdDSA':
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported signing algorithm {algorithm!r}")
+
+
+def new_key_id():
+    # Sorts by creation time, so the newest key is the last one
+    return f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{secrets.token_hex(4)}"
+
+
+def public_jwk(kid, public_key, algorithm):
+    if algorithm == 'RS256':
+        jwk = RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    else:
+        jwk = OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    return {**jwk, "kid": kid, "use": "sig", "alg": algorithm}
+
+
+class SigningKeys:
+    """
+    Asymmetric JWT signing keys for flask_jwt_extended.
+
+    With JWT_ALGORITHM set to RS256 or EdDSA, every PEM private key in
+    JWT_SIGNING_KEYS_DIR can verify tokens and the newest one signs them;
+    its id goes into the "kid" header. Rotating means adding a newer key
+    ('flask authentication rotate-signing-key') and deleting the old one
+    once the tokens it signed have expired. Workers reread the directory
+    when they restart or meet a token signed with a key they don't know.
+
+    The public keys are published as a JWKS document, so other nodes verify
+    tokens without the private keys. A node configured with JWT_JWKS_URL
+    instead of a key directory only verifies: it caches that document for
+    JWT_JWKS_CACHE_SECONDS and fetches it again when a token names a key it
+    doesn't know.
+
+    With the default HS256, none of this is used and JWT_SECRET_KEY signs.
+    """
+
+    def __init__(self, application=None):
+        self.algorithm = None
+        self.signing_kid = None
+        self._private_keys = {}
+        self._public_keys = {}
+        self._jwks_url = None
+        self._jwks_fetched = 0.0
+        self._lock = threading.Lock()
+        if application is not None:
+            self.init_app(application)
+
+    @property
+    def enabled(self):
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def init_app(self, application, jwt=None):
+        config = application.config
+        self.algorithm = config.get('JWT_ALGORITHM', 'HS256')
+        self.logger = application.logger
+        application.extensions['signing_keys'] = self
+
+        if not self.enabled:
+            return
+
+        self.signing_kid = None
+        self._private_keys, self._public_keys = {}, {}
+        self._jwks_fetched = 0.0
+        self.directory = config.get('JWT_SIGNING_KEYS_DIR')
+        self._jwks_url = config.get('JWT_JWKS_URL')
+        self.jwks_cache_seconds = config.get('JWT_JWKS_CACHE_SECONDS', 300)
+
+        if self._jwks_url:
+            self._fetch_jwks()
+        else:
+            self.load()
+            if not self._private_keys:
+                # Nothing to share with other nodes; fine for development and tests only
+                application.logger.warning("No JWT signing keys in JWT_SIGNING_KEYS_DIR, using a temporary key.")
+                self._add_private_key(new_key_id(), generate_private_key(self.algorithm))
+
+        if jwt is not None:
+            jwt.encode_key_loader(lambda identity: self.signing_key())
+            jwt.decode_key_loader(lambda jwt_header, jwt_payload: self.verification_key(jwt_header.get('kid')))
+            jwt.additional_headers_loader(lambda identity: {"kid": self.signing_kid})
+
+    def _add_private_key(self, kid, private_key):
+        self._private_keys[kid] = private_key
+        self._public_keys[kid] = private_key.public_key()
+        if self.signing_kid is None or kid > self.signing_kid:
+            self.signing_kid = kid
+
+    def load(self):
+        """(Re)read the private keys of the key directory; keeps the current keys if it has none."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith('.pem'))
+        if not names:
+            return
+
+        # Read everything first, requests keep using the current keys meanwhile
+        private_keys = {}
+        for name in names:
+            with open(os.path.join(self.directory, name), 'rb') as pem:
+                private_keys[name[:-len('.pem')]] = serialization.load_pem_private_key(pem.read(), password=None)
+        public_keys = {kid: private_key.public_key() for kid, private_key in private_keys.items()}
+
+        with self._lock:
+            self._private_keys, self._public_keys, self.signing_kid = private_keys, public_keys, max(private_keys)
+
+    def rotate(self):
+        """Write a new private key to the key directory; it signs from the next load on."""
+        os.makedirs(self.directory, exist_ok=True)
+        kid = new_key_id()
+        pem = generate_private_key(self.algorithm).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        path = os.path.join(self.directory, kid + '.pem')
+        with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as key_file:
+            key_file.write(pem)
+        return kid
+
+    def signing_key(self):
+        # Under the lock, so a concurrent load() can't pair a kid with the other key set
+        with self._lock:
+            if self.signing_kid is None:
+                raise RuntimeError("This node only verifies tokens, it has no JWT signing key.")
+            return self._private_keys[self.signing_kid]
+
+    def verification_key(self, kid):
+        age = time.monotonic() - self._jwks_fetched
+        if self._jwks_url:
+            if self._jwks_due(kid):
+                self._fetch_jwks(kid)
+        elif kid not in self._public_keys and age > 1:
+            # Another worker already signs with a key added since this one started
+            with self._lock:
+                reload = time.monotonic() - self._jwks_fetched > 1
+                if reload:
+                    self._jwks_fetched = time.monotonic()
+            if reload:
+                self.load()
+
+        key = self._public_keys.get(kid)
+        if key is None:
+            raise InvalidSignatureError("Token signed with an unknown key")
+        return key
+
+    def _jwks_due(self, kid):
+        # Refetch when stale, or when a token names a key rotated in since (at most once a second)
+        age = time.monotonic() - self._jwks_fetched
+        return age > self.jwks_cache_seconds or (kid not in self._public_keys and age > 1)
+
+    def _fetch_jwks(self, kid=None):
+        with self._lock:
+            # Requests that waited for the lock use what the first one fetched
+            if kid is not None and not self._jwks_due(kid):
+                return
+            self._jwks_fetched = time.monotonic()
+            try:
+                with urllib.request.urlopen(self._jwks_url, timeout=5) as response:
+                    self.load_jwks(json.load(response))
+            except (OSError, ValueError) as error:
+                # Keep verifying with the keys already known
+                self.logger.warning("message: \"JWKS fetch failed\", url: \"{}\", reason: \"{}\"".format(self._jwks_url, error))
+
+    def load_jwks(self, document):
+        """Use the public keys of a JWKS document for verification."""
+        keys = {}
+        for jwk in document.get('keys', ()):
+            # Tokens name their key, so one without a kid can't be picked
+            if jwk.get('alg') != self.algorithm or 'kid' not in jwk:
+                continue
+            loader = RSAAlgorithm if jwk['kty'] == 'RSA' else OKPAlgorithm
+            keys[jwk['kid']] = loader.from_jwk(jwk)
+        self._public_keys = keys
+
+    def jwks(self):
+        return {"keys": [public_jwk(kid, key, self.algorithm) for kid, key in sorted(self._public_keys.items())]}
@@ -0,0 +1,142 @@
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class NPlusOneError(AssertionError):
+    """The same statement ran once per row instead of once per request."""
+
+
+class RequestQueries:
+    """SQL executed while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        # statement -> distinct parameter sets it ran with
+        self.parameters = {}
+
+    def record(self, statement, parameters, elapsed_ms, limit):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest = statement
+
+        seen = self.parameters.setdefault(statement, set())
+        # Past the limit the statement is reported anyway, stop collecting
+        if len(seen) <= limit:
+            seen.add(repr(parameters))
+
+    def repeated(self, limit):
+        return {statement: len(seen) for statement, seen in self.parameters.items() if len(seen) >= limit}
+
+
+def _shorten(statement, length=200):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + '...'
+
+
+class QueryStats:
+    """
+    Per-request SQL instrumentation, in place of SQLALCHEMY_ECHO.
+
+    Every statement run during a request, on any engine, is counted and
+    timed. In debug mode the totals and the slowest statement are logged
+    for each request and sent as X-SQL-* response headers.
+
+    A statement that runs with SQL_N_PLUS_ONE_THRESHOLD or more different
+    parameter sets in one request is reported as an N+1 pattern: logged as a
+    warning, or raised as NPlusOneError when SQL_N_PLUS_ONE_ACTION is
+    "raise" (the default under TESTING).
+    """
+
+    def __init__(self, application=None):
+        self.threshold = 5
+        self.action = 'warn'
+        self.detected = 0
+        if application is not None:
+            self.init_app(application)
+
+    def init_app(self, application):
+        config = application.config
+        self.threshold = config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+        self.action = config.get('SQL_N_PLUS_ONE_ACTION') or ('raise' if application.testing else 'warn')
+        self.detected = 0
+
+        _listen_for_statements()
+        application.after_request(self._report)
+        application.extensions['query_stats'] = self
+
+    def current(self):
+        """Queries of the current request so far, or None outside a request."""
+        return g.get('sql_queries') if has_request_context() else None
+
+    def _report(self, response):
+        queries = g.pop('sql_queries', None)
+        if queries is None:
+            return response
+
+        if current_app.debug:
+            response.headers['X-SQL-Queries'] = str(queries.count)
+            response.headers['X-SQL-Time-Ms'] = f"{queries.total_ms:.1f}"
+            response.headers['X-SQL-Slowest-Ms'] = f"{queries.slowest_ms:.1f}"
+            current_app.logger.info(
+                f'path "{request.path}", sql_queries {queries.count}, sql_time_ms {queries.total_ms:.1f}, '
+                f'sql_slowest_ms {queries.slowest_ms:.1f}, sql_slowest "{_shorten(queries.slowest or "")}"'
+            )
+
+        repeated = queries.repeated(self.threshold) if self.action != 'ignore' else {}
+        if repeated:
+            self.detected += 1
+            details = '; '.join(f'{count}x "{_shorten(statement)}"' for statement, count in repeated.items())
+            message = f'N+1 queries on {request.method} {request.path}: {details}'
+            if self.action == 'raise':
+                raise NPlusOneError(message)
+            current_app.logger.warning(message)
+
+        return response
+
+    def stats(self):
+        return {"n_plus_one_threshold": self.threshold, "n_plus_one_detected": self.detected}
+
+
+#
+# Time every statement of every engine and record it on the current request.
+#
+_listening = False
+
+
+def _listen_for_statements():
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('sql_started', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['sql_started'].pop()) * 1000
+        if not has_request_context():
+            return
+
+        stats = current_app.extensions.get('query_stats')
+        if stats is None:
+            return
+
+        if 'sql_queries' not in g:
+            g.sql_queries = RequestQueries()
+        g.sql_queries.record(statement, parameters, elapsed_ms, stats.threshold)
+
+    @event.listens_for(Engine, 'handle_error')
+    def _failed(context):
+        started = context.connection.info.get('sql_started') if context.connection is not None else None
+        if started:
+            started.pop()
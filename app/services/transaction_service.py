@@ -0,0 +1,78 @@
+from flask import current_app, g, has_request_context
+
+
+class UnitOfWork:
+    """
+    One transaction per request.
+
+    Inside a request, commit() only flushes: ids, defaults and constraint
+    violations still surface at the call, but the writes of the whole
+    request are committed together once the view has returned a response
+    below 400, and rolled back for any error response. Outside a request
+    (CLI commands, the shell, background workers) commit() commits at once.
+
+    Side effects that must only happen once the writes are durable (sending
+    a code that was just stored, say) go through after_commit(): they run
+    after the request's commit succeeds and are dropped on rollback.
+    """
+
+    def __init__(self, application=None, db=None):
+        self.db = None
+        self.commits = 0
+        self.rollbacks = 0
+        if application is not None:
+            self.init_app(application, db)
+
+    def init_app(self, application, db):
+        self.db = db
+        self.commits = 0
+        self.rollbacks = 0
+        application.after_request(self._finish)
+        application.extensions['unit_of_work'] = self
+
+    def commit(self):
+        if has_request_context():
+            self.db.session.flush()
+            g.unit_of_work_pending = True
+        else:
+            self.db.session.commit()
+
+    def after_commit(self, callback):
+        """Call `callback` once the current request has committed; at once outside a request."""
+        if has_request_context():
+            g.setdefault('unit_of_work_callbacks', []).append(callback)
+        else:
+            callback()
+
+    def _finish(self, response):
+        pending = g.pop('unit_of_work_pending', False)
+        callbacks = g.pop('unit_of_work_callbacks', [])
+        if not pending and not callbacks:
+            return response
+
+        if response.status_code >= 400:
+            self.db.session.rollback()
+            self.rollbacks += 1
+            return response
+
+        try:
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            self.rollbacks += 1
+            current_app.logger.exception("Committing the request's changes failed")
+            raise
+
+        self.commits += 1
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # The writes are committed; the response stands
+                current_app.logger.exception("After-commit callback failed")
+
+        return response
+
+    def stats(self):
+        return {"commits": self.commits, "rollbacks": self.rollbacks}
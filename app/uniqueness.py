@@ -0,0 +1,103 @@
+import re
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+
+
+#
+# Uniqueness rules are (field, column, message key, message) tuples: `field`
+# of the input must not already be stored in `column`, otherwise `message` is
+# reported under `message key`.
+#
+
+
+#
+# Whether registrations check uniqueness with a query before inserting
+# ("query") or insert straight away and translate constraint violations
+# ("insert", see save_unique).
+#
+def checks_before_insert():
+    return current_app.config.get('UNIQUENESS_CHECK', 'query') != 'insert'
+
+
+#
+# Fields of `data` whose value is already stored, found in one round trip.
+#
+# Every rule becomes an EXISTS subquery of a single SELECT, so each one still
+# seeks its own index and stops at the first match, whatever table it is on.
+#
+def taken_fields(rules, data):
+    rules = [rule for rule in rules if data.get(rule[0]) not in (None, "")]
+    if not rules:
+        return set()
+
+    row = db.session.execute(
+        select(*(exists().where(column == data[field]).label(field) for field, column, _, _ in rules))
+    ).one()
+
+    return {field for (field, _, _, _), taken in zip(rules, row) if taken}
+
+
+#
+# Add the messages of the rules data breaks to a ValidationError's messages.
+#
+# Fields that already have a message (blank, malformed, ...) aren't looked
+# up, and messages already present are kept, like when every field was
+# checked in turn and the format checks ran last.
+#
+def check_unique(rules, data, messages):
+    if not checks_before_insert():
+        return
+
+    rules = [rule for rule in rules if rule[0] not in messages]
+    taken = taken_fields(rules, data)
+
+    conflicts = {}
+    for field, _, key, message in rules:
+        if field in taken:
+            conflicts[key] = message
+
+    for key, message in conflicts.items():
+        messages.setdefault(key, message)
+
+
+#
+# Save an instance, turning unique constraint violations into the
+# ValidationError the rules would have raised before the insert.
+#
+def save_unique(instance, rules):
+    try:
+        instance.save()
+
+    except IntegrityError as error:
+        db.session.rollback()
+
+        failed = _failed_columns(error)
+        messages = {}
+        for _, column, key, message in rules:
+            if column.name in failed:
+                messages[key] = message
+
+        if not messages:
+            raise
+
+        raise ValidationError(messages)
+
+
+#
+# Names of the columns a unique constraint violation reports.
+#
+def _failed_columns(error):
+    text = str(error.orig)
+
+    # SQLite: "UNIQUE constraint failed: distributor.email"
+    if 'UNIQUE constraint failed:' in text:
+        return {name.strip().split('.')[-1] for name in text.split('failed:', 1)[1].split(',')}
+
+    # MySQL: "Duplicate entry '...' for key 'distributor.email'" ('email' before 8.0)
+    match = re.search(r"for key '([^']+)'", text)
+    return {match.group(1).split('.')[-1]} if match else set()
@@ -8,8 +8,12 @@ from app.user import bp
 from flask import jsonify, abort, request, g, current_app, abort
 from marshmallow import ValidationError
 from app import filters, db
-from app.models import Agent, Distributor
-from app.schemas import AgentSchema, AgentRequestStatusSchema
+from app.extensions import cache, hashing_pool, replicas, unit_of_work, query_stats
+from app.models import Agent, Distributor, Profile
+from app.schemas import AgentSchema, DistributorSchema, SummaryDistributorSchema, AgentRequestStatusSchema
+from app.fieldsets import parse_fields
+from app.conditional import conditional_get
+from app.services.pool_service import pool_stats
 from app.user import user_service
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.exceptions import BadRequest
@@ -20,8 +24,9 @@ from app.authentication.decorators import is_admin
 @bp.route('/agents')
 # @jwt_required()
 def get_agents():
-    agents = Agent.query.all()
-    return AgentSchema().jsonify(agents, many=True)
+    only = parse_fields(request.args.get('fields'), AgentSchema)
+    agents = user_service.get_all_agents(only)
+    return jsonify(agents)
 
 
 #
@@ -38,6 +43,7 @@ def get_agent_by_id(id):
 #
 @bp.get('/profile/<string:id>')
 @jwt_required()
+@conditional_get(Profile, id_arg='id')
 def get_profile_by_id(id):
     agent = user_service.get_profile(id)
 
@@ -91,11 +97,14 @@ def request_approval(agent_id = None):
 #
 
 @bp.get('/distributors')
-@is_admin()
+@is_admin
+@conditional_get(Distributor)
+@cache.cached(['distributor'])
 def get_distributors_summery():
     try:
         
-        data = user_service.get_all_distributors_summary()
+        only = parse_fields(request.args.get('fields'), SummaryDistributorSchema)
+        data = user_service.get_all_distributors_summary(only)
 
         return jsonify({"data": data, "success": True, "message": "Distributors Retrieved Successfully!"}), 200
 
@@ -109,6 +118,7 @@ def get_distributors_summery():
 #
 @bp.get('/distributors/<string:id>')
 @jwt_required()
+@conditional_get(Distributor, id_arg='id')
 def get_distributor_by_id(id):
     try:
         data = user_service.get_distributor(id)
@@ -128,18 +138,16 @@ def get_distributor_by_id(id):
 @jwt_required()
 def get_agent_requests(request_id=None):
 
-    current_user = get_jwt_identity()
-
-    distributor_email = current_user['email']
+    distributor = user_service.current_distributor()
 
     data = None
 
     if request_id:
         # If request_id is provided, fetch the specific request
-        data = user_service.get_agent_requests(distributor_email, request_id)
+        data = user_service.get_agent_requests(distributor, request_id)
     
     else:
-        data = user_service.get_agent_requests(distributor_email)
+        data = user_service.get_agent_requests(distributor)
 
     return jsonify({ "success": True, "message": "Data retrieved Successfully", "data": data}), 200
 
@@ -158,11 +166,9 @@ def update_agent_request(request_id):
         # Verify Email
         validated_data = AgentRequestStatusSchema().load(input_data)
 
-        current_user = get_jwt_identity()
+        distributor = user_service.current_distributor()
 
-        distributor_email = current_user['email']
-
-        data = user_service.approve_and_add_agent(request_id, distributor_email, validated_data['status'])
+        data = user_service.approve_and_add_agent(request_id, distributor, validated_data['status'])
         
         return jsonify({ "success": True, "message": "Agent Approved Successfully!"}), 200
 
@@ -181,13 +187,46 @@ def update_agent_request(request_id):
 @bp.get('/admin/distributors')
 # @filters.is_admin
 @jwt_required()
+@cache.cached(['distributor', 'agent'])
 def get_distributors():
     try:
         
-        data = user_service.get_all_distributors()
+        only = parse_fields(request.args.get('fields'), DistributorSchema)
+        data = user_service.get_all_distributors(only)
 
         return jsonify({"data": data, "success": True, "message": "Distributors Retrieved Successfully!"}), 200
 
     except ValidationError as err:
         current_app.logger.info(err.messages)
-        return jsonify({"errors": err.messages, "success": False}), 400
\ No newline at end of file
+        return jsonify({"errors": err.messages, "success": False}), 400
+
+
+#
+# Response cache counters
+#
+@bp.get('/admin/cache')
+@is_admin
+def get_cache_stats():
+    return jsonify({"data": cache.stats(), "success": True, "message": "Cache Statistics Retrieved Successfully!"}), 200
+
+
+#
+# Password hashing pool counters
+#
+@bp.get('/admin/hashing')
+@is_admin
+def get_hashing_stats():
+    return jsonify({"data": hashing_pool.stats(), "success": True, "message": "Hashing Statistics Retrieved Successfully!"}), 200
+
+
+#
+# Database connection pool counters
+#
+@bp.get('/admin/db-pool')
+@is_admin
+def get_db_pool_stats():
+    data = pool_stats(db.engine)
+    data["replication"] = replicas.stats()
+    data["transactions"] = unit_of_work.stats()
+    data["queries"] = query_stats.stats()
+    return jsonify({"data": data, "success": True, "message": "Pool Statistics Retrieved Successfully!"}), 200
@@ -1,7 +1,11 @@
 from app import db
+from app.extensions import unit_of_work
 from flask import abort
+from flask_jwt_extended import get_current_user
 from app.models import Agent, Distributor, ApprovalRequest, Profile
 from app.schemas import ProfileSchema, AgentSchema, DistributorSchema, SummaryDistributorSchema, RequestSchema, AgentRequestStatusEnum
+from app.serializers import compiled_dump
+from app.fieldsets import loader_options, schema_fields, eager_loads
 
 #
 # Get user by username
@@ -15,7 +19,7 @@ def get_by_username(username):
 #
 def save(user):
     db.session.add(user)
-    db.session.commit()
+    unit_of_work.commit()
     return user
 
 
@@ -72,6 +76,18 @@ def get_distributor_by_email(distributor_email):
 
     return distributor_data
 
+# 
+#  Distributor behind the access token of the current request
+#   
+def current_distributor():
+    # Resolved once per request by the jwt user lookup loader
+    distributor = get_current_user()
+
+    if not isinstance(distributor, Distributor):
+        abort(404, description="Distributor not found")
+
+    return distributor
+
 # 
 #  Get Agent by id
 #   
@@ -99,24 +115,33 @@ def check_agent_distributor_status(agent_id):
     return agent
 
 
+# 
+#  Get all Agents
+#   
+def get_all_agents(only=None):
+
+    agents = Agent.query.options(*loader_options(Agent, only, schema=AgentSchema)).all()
+
+    return compiled_dump(AgentSchema, only)(agents)
+
 # 
 #  Get all Distributors
 #   
-def get_all_distributors():
+def get_all_distributors(only=None):
 
-    distributors = Distributor.query.all()
+    distributors = Distributor.query.options(*loader_options(Distributor, only, schema=DistributorSchema)).all()
 
-    distributor_data = DistributorSchema().dump(distributors, many=True)
+    distributor_data = compiled_dump(DistributorSchema, only)(distributors)
     return distributor_data
 
 # 
 #  Get all Distributors
 #   
-def get_all_distributors_summary():
+def get_all_distributors_summary(only=None):
 
-    distributors = Distributor.query.all()
+    distributors = Distributor.query.options(*loader_options(Distributor, only or schema_fields(SummaryDistributorSchema))).all()
 
-    distributor_data = SummaryDistributorSchema().dump(distributors, many=True)
+    distributor_data = SummaryDistributorSchema(only=only).dump(distributors, many=True)
     return distributor_data
 
 
@@ -150,13 +175,13 @@ def request_approval(agent_id, distributor_id):
 #  Retrieve all requests made to a distributor from agents
 #   
 
-def get_agent_requests(distributor_email, request_id=None):
+def get_agent_requests(distributor, request_id=None):
 
-    distributor_id = get_distributor_by_email(distributor_email).id
+    distributor_id = distributor.id
 
     if not request_id:
 
-        all_requests = ApprovalRequest.query.filter_by(distributor_id=distributor_id)
+        all_requests = ApprovalRequest.query.options(*eager_loads(ApprovalRequest, RequestSchema)).filter_by(distributor_id=distributor_id)
 
         return RequestSchema().dump(all_requests, many=True)
 
@@ -172,9 +197,9 @@ def get_agent_requests(distributor_email, request_id=None):
     return formatted_request
 
 
-def approve_and_add_agent(request_id, distributor_email, status):
+def approve_and_add_agent(request_id, distributor, status):
 
-    distributor_id = get_distributor_by_email(distributor_email).id
+    distributor_id = distributor.id
 
     approval_request = ApprovalRequest.get_request_by_id(request_id)
 
@@ -0,0 +1,104 @@
+import re
+
+
+#
+# Declarative input validation.
+#
+# A Rules object holds, for each field, a chain of checks. Like the if/elif
+# chains it replaces, the first failing check of a field records its message
+# and the rest of that field's chain is skipped. The rules are compiled once,
+# when the schema class is defined, into a single straight-line function
+# (regular expressions included), so validating a payload is one pass with no
+# per-check calls.
+#
+#     RULES = Rules(
+#         email=[required("Email field is blank."), pattern(EMAIL_PATTERN, "Invalid email address.")],
+#     )
+#     messages = RULES.errors(data)
+#
+
+_MISSING = object()
+
+
+class Check:
+    """
+    One check of a chain. `condition` is the source of an expression that is
+    true when the check fails; "{value}" stands for the field's value and
+    names in `bindings` are made available to it.
+    """
+
+    def __init__(self, condition, message, field=None, bindings=None):
+        self.condition = condition
+        self.message = message
+        self.field = field
+        self.bindings = bindings or {}
+
+
+class Rules:
+    def __init__(self, **chains):
+        self.chains = tuple((field, tuple(chain)) for field, chain in chains.items())
+        self.errors = _compile(self.chains)
+
+    def extend(self, **chains):
+        """Rules with these chains appended to the current ones."""
+        return Rules(**dict(self.chains), **chains)
+
+
+def _compile(chains):
+    namespace = {'_MISSING': _MISSING}
+    body = ["def errors(data):", "    messages = {}", "    get = data.get"]
+
+    for position, (field, chain) in enumerate(chains):
+        value = 'v%d' % position
+        body.append(f"    {value} = get({field!r}, _MISSING)")
+
+        for index, check in enumerate(chain):
+            prefix = {}
+            for name, bound in check.bindings.items():
+                unique = f'{name}_{position}_{index}'
+                namespace[unique] = bound
+                prefix[name] = unique
+
+            condition = check.condition.format(value=value, **prefix)
+            message = f'm_{position}_{index}'
+            namespace[message] = check.message
+
+            keyword = 'if' if index == 0 else 'elif'
+            body.append(f"    {keyword} {condition}:")
+            body.append(f"        messages[{(check.field or field)!r}] = {message}")
+
+    body.append("    return messages")
+
+    exec(compile("\n".join(body), "<validation rules>", "exec"), namespace)
+    return namespace['errors']
+
+
+#
+# Checks. The ones after `required` in a chain only see present values; a
+# chain without `required` sees a missing value as "".
+#
+def required(message, field=None):
+    """Present and not an empty string. With `field`, checks and reports that field instead."""
+    if field is None:
+        return Check("{value} is _MISSING or {value} == ''", message)
+    return Check(f"get({field!r}, '') == ''", message, field)
+
+
+def min_length(length, message):
+    return Check(f"len({{value}}) < {int(length)}", message)
+
+
+def pattern(regex, message):
+    """re.match semantics: the pattern is anchored at the start only."""
+    return Check("not {match}('' if {value} is _MISSING else {value})", message, bindings={'match': re.compile(regex).match})
+
+
+def all_patterns(regexes, message):
+    bindings = {f'match{index}': re.compile(regex).match for index, regex in enumerate(regexes)}
+    condition = " and ".join(f"{{{name}}}({{value}})" for name in bindings)
+    return Check(f"not ({condition})", message, bindings=bindings)
+
+
+def equal_to(other, message):
+    """Same value as the `other` field; reported under `other`."""
+    return Check(f"{{value}} != get({other!r})", message, other)
@@ -0,0 +1,101 @@
+import random
+import string
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import insert
+
+from config import Config
+from app.extensions import db
+from app.ids import new_id
+from app.models import Agent, ApprovalRequest, Distributor, Purchase
+
+
+PRODUCT_CATEGORIES = ['phone', 'laptop', 'tablet', 'watch', 'console', 'camera']
+PURCHASE_STATUSES = ['pending'] * 10 + ['approved'] * 85 + ['rejected'] * 5
+REQUEST_STATUSES = ['pending'] * 20 + ['approved'] * 70 + ['rejected'] * 10
+
+# Rows sent per executemany while seeding
+SEED_BATCH_SIZE = 5000
+
+
+#
+# Bare application with only the database wired in, so benchmarks don't
+# depend on blueprints or third-party services.
+#
+def make_app(database_uri):
+    application = Flask(__name__)
+    application.config.from_object(Config)
+    application.config.update(SQLALCHEMY_DATABASE_URI=database_uri, SQLALCHEMY_ECHO=False)
+    db.init_app(application)
+    return application
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + SEED_BATCH_SIZE])
+
+
+def _secret(length=12):
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+
+
+#
+# Seed distributors, agents, purchases and approval requests.
+#
+# Must run inside an application context against an empty database.
+#
+def seed(distributors=50, agents=2000, purchases=100000, requests=5000, rng_seed=7):
+    random.seed(rng_seed)
+    now = datetime.utcnow()
+
+    distributor_rows = [
+        {
+            'id': new_id(), 'business_name': f'Distributor {i}', 'representative_name': f'Representative {i}',
+            'email': f'distributor{i}@example.com', 'password': 'x', 'created': now, 'updated': now,
+        }
+        for i in range(distributors)
+    ]
+    distributor_ids = [row['id'] for row in distributor_rows]
+
+    agent_rows = [
+        {
+            'id': new_id(), 'firstname': f'First{i}', 'lastname': f'Last{i}', 'email': f'agent{i}@example.com',
+            'password': 'x', 'distributor_id': random.choice(distributor_ids), 'created': now, 'updated': now,
+        }
+        for i in range(agents)
+    ]
+
+    purchase_rows = []
+    for i in range(purchases):
+        agent = random.choice(agent_rows)
+        purchase_rows.append({
+            'id': new_id(), 'firstname': f'Buyer{i}', 'lastname': f'Customer{i % 997}',
+            'email': f'buyer{i}@example.com', 'product_category': random.choice(PRODUCT_CATEGORIES),
+            'product': f'Model {i % 211}', 'phone_number': f'080{i:08d}',
+            'purchase_status': random.choice(PURCHASE_STATUSES),
+            'purchase_date': now - timedelta(minutes=random.randint(0, 60 * 24 * 365)),
+            'purchase_secret': _secret(), 'agent_id': agent['id'], 'distributor_id': agent['distributor_id'],
+            'created': now, 'updated': now,
+        })
+
+    request_rows = [
+        {
+            'id': new_id(), 'agent_id': random.choice(agent_rows)['id'],
+            'distributor_id': random.choice(distributor_ids), 'status': random.choice(REQUEST_STATUSES),
+            'created': now, 'updated': now,
+        }
+        for _ in range(requests)
+    ]
+
+    _insert(Distributor, distributor_rows)
+    _insert(Agent, agent_rows)
+    _insert(Purchase, purchase_rows)
+    _insert(ApprovalRequest, request_rows)
+    db.session.commit()
+
+    return {
+        'distributor_id': distributor_ids[0],
+        'agent_id': agent_rows[0]['id'],
+        'request': request_rows[0] if request_rows else None,
+    }
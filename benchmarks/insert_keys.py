@@ -0,0 +1,96 @@
+"""Compare insert throughput of random and time-ordered primary keys.
+
+Fills tables shaped like purchase, keyed by random UUIDv4 strings in
+VARCHAR(36) (the former keys), by UUIDv4 in BINARY(16) and by UUIDv7 in
+BINARY(16) (the CompactUUID keys), and reports rows per second for every
+slice of the run. Keys are generated in the form they are stored in, so
+the two BINARY(16) tables differ only in key order: random keys scatter
+inserts over the whole primary key index, so their throughput drops as the
+index outgrows the cache, while time-ordered keys always append to its
+right edge.
+
+    python -m benchmarks.insert_keys
+    python -m benchmarks.insert_keys --database-uri mysql+pymysql://root:pw@localhost/bench --rows 5000000
+
+The bench_* tables are created for the run and dropped afterwards.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import BINARY, Column, DateTime, MetaData, String, Table, create_engine, insert
+
+from app.ids import uuid7
+
+
+metadata = MetaData()
+
+
+def key_table(name, key_type):
+    return Table(
+        name, metadata,
+        Column('id', key_type, primary_key=True),
+        Column('agent_id', key_type, nullable=False, index=True),
+        Column('email', String(128), nullable=False),
+        Column('created', DateTime, nullable=False),
+    )
+
+
+CASES = [
+    ('uuid4 VARCHAR(36)', key_table('bench_uuid4_text_keys', String(36)), lambda: str(uuid4())),
+    ('uuid4 BINARY(16)', key_table('bench_uuid4_keys', BINARY(16)), lambda: uuid4().bytes),
+    ('uuid7 BINARY(16)', key_table('bench_uuid7_keys', BINARY(16)), lambda: uuid7().bytes),
+]
+
+
+def fill(engine, table, make_key, rows, batch_size, slices):
+    agent_ids = [make_key() for _ in range(100)]
+    created = datetime.utcnow()
+    slice_rows = rows // slices
+    rates = []
+
+    for part in range(slices):
+        elapsed = 0.0
+        for start in range(0, slice_rows, batch_size):
+            batch = [
+                {'id': make_key(), 'agent_id': agent_ids[number % 100], 'email': f'buyer{number}@example.com',
+                 'created': created}
+                for number in range(part * slice_rows + start, part * slice_rows + min(start + batch_size, slice_rows))
+            ]
+            started = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(insert(table), batch)
+            elapsed += time.perf_counter() - started
+        rates.append(slice_rows / elapsed)
+
+    return rates
+
+
+def run(args):
+    engine = create_engine(args.database_uri)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    try:
+        print(f'{args.rows} rows per table on {engine.dialect.name}, rows/s per slice of {args.rows // args.slices}\n')
+        for name, table, make_key in CASES:
+            rates = fill(engine, table, make_key, args.rows, args.batch_size, args.slices)
+            print(f"{name:<18} {'  '.join(f'{rate:>8.0f}' for rate in rates)}   (last/first {rates[-1] / rates[0]:.2f})")
+    finally:
+        metadata.drop_all(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--slices', type=int, default=5)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
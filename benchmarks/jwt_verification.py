@@ -0,0 +1,75 @@
+"""Measure the cost of verifying one access token per signing algorithm.
+
+Signs tokens shaped like the ones generate_auth_token issues with HS256 (the
+shared secret), RS256 and EdDSA, then times jwt.decode on each. The
+asymmetric keys are looked up by "kid" through a SigningKeys loaded from a
+JWKS document, the way a verify-only node would.
+
+    python -m benchmarks.jwt_verification --tokens 2000
+"""
+import argparse
+import secrets
+import time
+from uuid import uuid4
+
+import jwt
+
+from app.services.signing_service import SigningKeys, generate_private_key, new_key_id, public_jwk
+
+
+def claims(number):
+    now = int(time.time())
+    return {
+        "sub": {"email": f"agent{number}@example.com", "role": 1},
+        "jti": str(uuid4()), "type": "access", "fresh": False,
+        "iat": now, "nbf": now, "exp": now + 1800,
+    }
+
+
+def verifier(algorithm, kid, private_key):
+    keys = SigningKeys()
+    keys.algorithm = algorithm
+    keys.load_jwks({"keys": [public_jwk(kid, private_key.public_key(), algorithm)]})
+    return keys
+
+
+def time_per_token(tokens, key_for, algorithm, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for token in tokens:
+            jwt.decode(token, key_for(token), algorithms=[algorithm])
+        timings.append((time.perf_counter() - started) / len(tokens))
+    return min(timings)
+
+
+def run(args):
+    print(f"{'algorithm':<10} {'sign µs':>9} {'verify µs':>10} {'verifications/s':>16}")
+
+    secret = secrets.token_hex(32)
+    cases = [('HS256', secret, {}, lambda token: secret)]
+
+    for algorithm in ('RS256', 'EdDSA'):
+        kid, private_key = new_key_id(), generate_private_key(algorithm)
+        keys = verifier(algorithm, kid, private_key)
+        key_for = lambda token, keys=keys: keys.verification_key(jwt.get_unverified_header(token)['kid'])
+        cases.append((algorithm, private_key, {"kid": kid}, key_for))
+
+    for algorithm, signing_key, headers, key_for in cases:
+        started = time.perf_counter()
+        tokens = [jwt.encode(claims(number), signing_key, algorithm=algorithm, headers=headers) for number in range(args.tokens)]
+        sign = (time.perf_counter() - started) / args.tokens
+
+        verify = time_per_token(tokens, key_for, algorithm, args.repeat)
+        print(f'{algorithm:<10} {sign * 1e6:>9.1f} {verify * 1e6:>10.1f} {1 / verify:>16,.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
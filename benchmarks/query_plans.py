@@ -0,0 +1,126 @@
+"""Check that the hot service lookups are served by an index.
+
+Seeds a database with realistic volumes, runs each lookup, times it and
+asks the database for its query plan. Exits non-zero when any lookup falls
+back to a full table scan.
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --database-uri mysql+pymysql://root:pw@localhost/bench --purchases 1000000
+
+The target database must be empty; tables are created if missing.
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import Agent, ApprovalRequest, Distributor, Purchase
+from app.pagination import keyset_paginate
+from benchmarks.common import make_app, seed
+
+
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+
+def hot_queries(ids):
+    now = datetime.utcnow()
+    _, cursor = keyset_paginate(Purchase.query, [Purchase.purchase_date, Purchase.id], 50)
+
+    return [
+        ('purchases by agent', lambda: Purchase.query.filter_by(agent_id=ids['agent_id']).all()),
+        ('purchases by distributor', lambda: Purchase.query.filter_by(distributor_id=ids['distributor_id']).all()),
+        ('purchases by status', lambda: Purchase.query.filter_by(purchase_status='pending').limit(500).all()),
+        ('purchases by date range', lambda: Purchase.query.filter(
+            Purchase.purchase_date >= now - timedelta(days=2), Purchase.purchase_date < now).all()),
+        ('purchase page (keyset)', lambda: keyset_paginate(
+            Purchase.query, [Purchase.purchase_date, Purchase.id], 50, cursor)),
+        ('agents of distributor', lambda: db.session.get(Distributor, ids['distributor_id']).agents),
+        ('pending requests of distributor', lambda: ApprovalRequest.query.filter_by(
+            distributor_id=ids['distributor_id'], status='pending').all()),
+        ('get_pending_request', lambda: ApprovalRequest.get_pending_request(
+            ids['request']['agent_id'], ids['request']['distributor_id'])),
+    ]
+
+
+#
+# Returns (plan text, is full scan) for a statement as sent to the driver.
+#
+def explain(connection, statement, parameters):
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        details = [row[-1] for row in rows]
+        return '; '.join(details), any(SQLITE_FULL_SCAN.match(detail) for detail in details)
+
+    rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters).mappings().fetchall()
+    plan = '; '.join(f"{row['table']}:{row['type']}:{row['key']}" for row in rows)
+    return plan, any(row['type'] == 'ALL' for row in rows)
+
+
+def run(args):
+    application = make_app(args.database_uri)
+
+    with application.app_context():
+        db.create_all()
+
+        if db.session.query(Purchase.id).first() is not None:
+            sys.exit('The benchmark database must be empty.')
+
+        started = time.perf_counter()
+        ids = seed(args.distributors, args.agents, args.purchases, args.requests)
+        print(f'seeded {args.purchases} purchases in {time.perf_counter() - started:.1f}s on {db.engine.dialect.name}\n')
+
+        captured = []
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        failures = 0
+        print(f"{'lookup':<34} {'median ms':>10}  plan")
+
+        for name, lookup in hot_queries(ids):
+            db.session.expire_all()
+            captured.clear()
+            lookup()
+            statement, parameters = captured[-1]
+
+            timings = []
+            for _ in range(args.repeat):
+                db.session.expire_all()
+                started = time.perf_counter()
+                lookup()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            with db.engine.connect() as connection:
+                plan, full_scan = explain(connection, statement, parameters)
+
+            failures += full_scan
+            flag = 'FULL SCAN ' if full_scan else ''
+            print(f'{name:<34} {statistics.median(timings):>10.2f}  {flag}{plan}')
+
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    if failures:
+        sys.exit(f'\n{failures} lookup(s) use a full table scan.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    parser.add_argument('--distributors', type=int, default=50)
+    parser.add_argument('--agents', type=int, default=2000)
+    parser.add_argument('--purchases', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
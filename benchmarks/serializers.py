@@ -0,0 +1,75 @@
+"""Compare compiled serializers with marshmallow on the hot list endpoints.
+
+Dumps the same rows through schema.dump and through compile_schema, checks
+that both produce byte-identical JSON, and reports the throughput of each.
+Exits non-zero on any difference.
+
+    python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.extensions import db
+from app.models import Agent, Distributor, Purchase
+from app.schemas import AgentSchema, DistributorSchema, PurchaseSchema
+from app.serializers import compile_schema
+from benchmarks.common import make_app, seed
+
+
+def best_of(repeat, dump, rows):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dump(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(args):
+    application = make_app(args.database_uri)
+
+    with application.app_context():
+        db.create_all()
+        seed(distributors=50, agents=args.rows, purchases=args.rows, requests=0)
+
+        cases = [
+            ('PurchaseSchema', PurchaseSchema(many=True), Purchase.query.options(joinedload(Purchase.agent)).all()),
+            ('AgentSchema', AgentSchema(many=True), Agent.query.options(joinedload(Agent.distributor)).all()),
+            ('DistributorSchema', DistributorSchema(many=True), Distributor.query.options(selectinload(Distributor.agents)).all()),
+        ]
+
+        mismatches = 0
+        print(f"{'schema':<20} {'rows':>7} {'marshmallow rows/s':>19} {'compiled rows/s':>16} {'speedup':>8}")
+
+        for name, schema, rows in cases:
+            compiled = compile_schema(schema)
+
+            if json.dumps(schema.dump(rows)) != json.dumps(compiled(rows)):
+                mismatches += 1
+                print(f'{name:<20} OUTPUT DIFFERS')
+                continue
+
+            reference = best_of(args.repeat, schema.dump, rows)
+            fast = best_of(args.repeat, compiled, rows)
+            print(f'{name:<20} {len(rows):>7} {len(rows) / reference:>19,.0f} {len(rows) / fast:>16,.0f} {reference / fast:>7.1f}x')
+
+    if mismatches:
+        sys.exit(f'\n{mismatches} schema(s) dump differently from marshmallow.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-uri', default='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
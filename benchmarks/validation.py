@@ -0,0 +1,183 @@
+"""Compare the declarative validation rules with the hand-written checks they replaced.
+
+Runs every input schema's RULES and a copy of its former if/elif validator
+over a valid payload and a set of broken ones, checks that both report the
+same messages, and prints the validation cost per payload of each. Exits
+non-zero on any difference. No database is needed.
+
+    python -m benchmarks.validation --repeat 20000
+"""
+import argparse
+import re
+import sys
+import time
+
+from app.schemas import (
+    AgentOtpSchema, AgentOtpVerificationSchema, AgentRegistrationSchema,
+    DistributorRegistrationSchema, InsuranceCompanyRegistrationSchema, PurchaseRegistrationSchema,
+)
+
+
+#
+# The former validators, kept as the reference: re.match on string patterns,
+# one if/elif chain per field.
+#
+def legacy_name(data, messages, field, label, length=3):
+    if field not in data or data[field] == "":
+        messages[field] = f"{label} field is blank."
+    elif len(data[field]) < length:
+        messages[field] = f"{label} is too short."
+
+
+def legacy_blank(data, messages, field, label):
+    if field not in data or data[field] == "":
+        messages[field] = f"{label} field is blank."
+
+
+def legacy_email(data, messages, field="email", label="Email"):
+    if field not in data or data[field] == "":
+        messages[field] = f"{label} field is blank."
+    elif not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", data[field]):
+        messages[field] = "Invalid email address."
+
+
+def legacy_password(data, messages):
+    if "password" not in data or data["password"] == "":
+        messages["password"] = "Password field is blank."
+    elif len(data["password"]) < 8:
+        messages["password"] = "Password is too short. Must be 8 or more characters"
+    elif not (re.match(r"\w*[A-Z]", data["password"])
+            and re.match(r"\w*[a-z]", data["password"])
+            and re.match(r"\w*[0-9]", data["password"])):
+        messages["password"] = "Password must include an uppercase character, lowercase character, and number."
+    elif "confirm_password" not in data or data["confirm_password"] == "":
+        messages["confirm_password"] = "Please enter the password again."
+    elif data["password"] != data["confirm_password"]:
+        messages["confirm_password"] = "Passwords must match."
+
+
+def legacy_agent(data):
+    messages = {}
+    legacy_name(data, messages, "firstname", "Firstname")
+    legacy_name(data, messages, "lastname", "Lastname")
+    legacy_email(data, messages)
+    legacy_password(data, messages)
+    return messages
+
+
+def legacy_distributor(data):
+    messages = {}
+    legacy_name(data, messages, "business_name", "Business_name")
+    legacy_name(data, messages, "representative_name", "Representative_name")
+    legacy_email(data, messages)
+    legacy_password(data, messages)
+    return messages
+
+
+def legacy_insurance(data):
+    messages = {}
+    legacy_name(data, messages, "company_name", "Company_name")
+    legacy_email(data, messages, "contact_email", "Contact_email")
+    legacy_email(data, messages)
+    if "contact_phone" not in data or data["contact_phone"] == "":
+        messages["contact_phone"] = "Contact_phone field is blank."
+    elif len(data["contact_phone"]) < 10:
+        messages["contact_phone"] = "Contact_phone number is too short."
+    legacy_password(data, messages)
+    return messages
+
+
+def legacy_purchase(data):
+    messages = {}
+    legacy_name(data, messages, "firstname", "Firstname")
+    legacy_name(data, messages, "lastname", "Lastname")
+    legacy_email(data, messages)
+    legacy_blank(data, messages, "product_category", "Product_category")
+    legacy_blank(data, messages, "product", "Product")
+    legacy_blank(data, messages, "phone_number", "Phone Number")
+    return messages
+
+
+def legacy_otp(data):
+    messages = {}
+    legacy_email(data, messages)
+    return messages
+
+
+def legacy_otp_verification(data):
+    messages = legacy_otp(data)
+    if not re.match(r"^[0-9]{6}$", data.get("otp", "")):
+        messages["otp"] = "The code must be 6 digits."
+    return messages
+
+
+PASSWORD = {"password": "Secret123", "confirm_password": "Secret123"}
+
+CASES = [
+    ('AgentRegistration', AgentRegistrationSchema, legacy_agent,
+     {"firstname": "Ann", "lastname": "Lee", "email": "ann@example.com", **PASSWORD}),
+    ('DistributorRegistration', DistributorRegistrationSchema, legacy_distributor,
+     {"business_name": "Acme", "representative_name": "Rep", "email": "d@example.com", **PASSWORD}),
+    ('InsuranceRegistration', InsuranceCompanyRegistrationSchema, legacy_insurance,
+     {"company_name": "Cover", "contact_email": "c@example.com", "email": "i@example.com", "contact_phone": "0123456789", **PASSWORD}),
+    ('PurchaseRegistration', PurchaseRegistrationSchema, legacy_purchase,
+     {"firstname": "Bob", "lastname": "Smith", "email": "b@example.com", "product_category": "phone", "product": "P1", "phone_number": "123"}),
+    ('AgentOtp', AgentOtpSchema, legacy_otp, {"email": "ann@example.com"}),
+    ('AgentOtpVerification', AgentOtpVerificationSchema, legacy_otp_verification, {"email": "ann@example.com", "otp": "123456"}),
+]
+
+
+#
+# The valid payload plus, for every field, the payload with that field
+# missing, blank, too short and malformed, and one with everything broken.
+#
+def variants(valid):
+    payloads = [valid]
+    for field in valid:
+        without = dict(valid)
+        del without[field]
+        payloads += [without, {**valid, field: ""}, {**valid, field: "ab"}, {**valid, field: "not an email\n"}]
+    payloads += [{**valid, "password": "alllowercase1", "confirm_password": "alllowercase1"},
+                 {**valid, "confirm_password": "Different123"},
+                 {field: "" for field in valid}]
+    return payloads
+
+
+def per_payload(repeat, validate, payloads):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            validate(payload)
+    return (time.perf_counter() - started) / (repeat * len(payloads))
+
+
+def run(args):
+    mismatches = 0
+    print(f"{'schema':<24} {'payloads':>8} {'hand-written µs':>16} {'rules µs':>9} {'speedup':>8}")
+
+    for name, schema_class, legacy, valid in CASES:
+        payloads = variants(valid)
+        errors = schema_class.RULES.errors
+
+        differing = [payload for payload in payloads if errors(payload) != legacy(payload)]
+        if differing:
+            mismatches += 1
+            print(f'{name:<24} MESSAGES DIFFER for {differing[0]!r}')
+            continue
+
+        reference = per_payload(args.repeat, legacy, payloads)
+        engine = per_payload(args.repeat, errors, payloads)
+        print(f'{name:<24} {len(payloads):>8} {reference * 1e6:>16.2f} {engine * 1e6:>9.2f} {reference / engine:>7.1f}x')
+
+    if mismatches:
+        sys.exit(f'\n{mismatches} schema(s) report different messages.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -8,11 +8,68 @@ class Config(object):
     SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True
+    # Connection pool (MySQL); SQLALCHEMY_ENGINE_OPTIONS is derived from these in create_app
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    DB_POOL_PRE_PING = (os.environ.get('DB_POOL_PRE_PING') or 'true').lower() in ('1', 'true', 'yes')
+    # Read replicas (comma separated URIs): SELECTs of GET/HEAD/OPTIONS requests go to
+    # them, round robin. A client that wrote reads from the primary for STICKY seconds;
+    # a replica failing its health check is skipped for RETRY seconds, and connecting to
+    # one gives up after CONNECT_TIMEOUT seconds.
+    DB_REPLICA_URIS = [uri for uri in (os.environ.get('DB_REPLICA_URIS') or '').split(',') if uri]
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS') or 10)
+    DB_REPLICA_HEALTH_CHECK_SECONDS = int(os.environ.get('DB_REPLICA_HEALTH_CHECK_SECONDS') or 5)
+    DB_REPLICA_RETRY_SECONDS = int(os.environ.get('DB_REPLICA_RETRY_SECONDS') or 30)
+    DB_REPLICA_CONNECT_TIMEOUT = int(os.environ.get('DB_REPLICA_CONNECT_TIMEOUT') or 2)
+    # Statement logging for local debugging only; requests are instrumented by QueryStats
+    SQLALCHEMY_ECHO = (os.environ.get('SQLALCHEMY_ECHO') or 'false').lower() in ('1', 'true', 'yes')
+    # Per-request SQL counters are logged and sent as X-SQL-* headers in debug mode.
+    # A statement run with this many different parameter sets in one request is an
+    # N+1 pattern: "warn" logs it, "raise" fails the request (default under TESTING).
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD') or 5)
+    SQL_N_PLUS_ONE_ACTION = os.environ.get('SQL_N_PLUS_ONE_ACTION')
+    # werkzeug hash method, e.g. "scrypt" or "pbkdf2:sha256:600000". Existing
+    # hashes made with another method or cost are upgraded at the next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    # Password hashing runs on a bounded pool; requests beyond workers + queue get a 503
+    HASHING_POOL_WORKERS = int(os.environ.get('HASHING_POOL_WORKERS') or 0) or None
+    HASHING_POOL_MAX_QUEUE = int(os.environ.get('HASHING_POOL_MAX_QUEUE') or 32)
+    # Seconds a resolved JWT identity is reused before it is read again
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 60)
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES') or 4096)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET')
+    # HS256 signs with JWT_SECRET_KEY. RS256 or EdDSA sign with the newest private key
+    # in JWT_SIGNING_KEYS_DIR and publish the public keys at /api/.well-known/jwks.json;
+    # a verify-only node sets JWT_JWKS_URL to another node's document instead.
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM') or 'HS256'
+    JWT_SIGNING_KEYS_DIR = os.environ.get('JWT_SIGNING_KEYS_DIR') or os.path.join(basedir, 'keys')
+    JWT_JWKS_URL = os.environ.get('JWT_JWKS_URL')
+    JWT_JWKS_CACHE_SECONDS = int(os.environ.get('JWT_JWKS_CACHE_SECONDS') or 300)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # How stale a worker's view of revoked tokens may get
+    REVOCATION_REFRESH_SECONDS = int(os.environ.get('REVOCATION_REFRESH_SECONDS') or 5)
+    # Registration uniqueness: "query" checks every unique field in one query before
+    # inserting; "insert" inserts at once and maps unique constraint violations to
+    # field messages (only fields backed by a unique constraint are covered)
+    UNIQUENESS_CHECK = os.environ.get('UNIQUENESS_CHECK') or 'query'
+    OTP_LIFETIME = timedelta(minutes=10)
+    OTP_MAX_ATTEMPTS = 5
+    # OTP emails/SMS are sent from background workers through this provider class
+    DELIVERY_PROVIDER = os.environ.get('DELIVERY_PROVIDER') or 'app.services.delivery_service.LocalProvider'
+    DELIVERY_WORKERS = int(os.environ.get('DELIVERY_WORKERS') or 2)
+    DELIVERY_MAX_QUEUE = int(os.environ.get('DELIVERY_MAX_QUEUE') or 1000)
+    DELIVERY_MAX_ATTEMPTS = int(os.environ.get('DELIVERY_MAX_ATTEMPTS') or 5)
+    DELIVERY_BACKOFF_SECONDS = float(os.environ.get('DELIVERY_BACKOFF_SECONDS') or 1)
     CLOUDINARY_CLOUD_NAME = os.environ.get('CLOUDINARY_CLOUD_NAME')
     CLOUDINARY_API_KEY = os.environ.get('CLOUDINARY_API_KEY')
     CLOUDINARY_API_SECRET = os.environ.get('CLOUDINARY_API_SECRET')
     APPLICATION_ROOT = "/app"
+    # Response cache: "memory" (per process), "redis" (shared, needs CACHE_REDIS_URL)
+    # or "local" (the shared code path backed by an in-process stand-in)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL') or 300)
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 1024)
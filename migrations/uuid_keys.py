@@ -0,0 +1,186 @@
+"""
+Helpers shared by revisions 7c3e9a1f5b20 (expand) and 4e8b2d6f1a97 (contract),
+which move the UUID keys from 36 character strings to BINARY(16) twins named
+<column>_bin. migrations/ is not a package, so the revisions load this file
+by path. Changing it changes both revisions, which may already be applied.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Key columns of every table, parents before children
+KEY_COLUMNS = {
+    'profile': ['id'],
+    'distributor': ['id', 'profile_id'],
+    'agent': ['id', 'distributor_id', 'profile_id'],
+    'insurance_company': ['id'],
+    'purchase': ['id', 'agent_id', 'distributor_id'],
+    'approval_request': ['id', 'agent_id', 'distributor_id'],
+    'policy': ['id', 'agent_id', 'purchase_id', 'insurance_company_id'],
+    # '' (no distributor) becomes the nil UUID, primary key columns can't be NULL
+    'sales_rollup': ['agent_id', 'distributor_id'],
+    'account_directory': ['account_id'],
+}
+
+# Indexes over the string key columns, named ix_<table>_<columns>
+KEY_INDEXES = {
+    'agent': [['distributor_id']],
+    'purchase': [['agent_id'], ['distributor_id'], ['purchase_date', 'id']],
+    'approval_request': [['distributor_id', 'status'], ['agent_id', 'distributor_id', 'status']],
+    'account_directory': [['account_type', 'account_id']],
+}
+
+# Rows converted per statement
+BATCH_SIZE = 5000
+
+NIL = uuid.UUID(int=0)
+
+# MySQL expressions converting column "{c}" to the 16 byte form and back
+TO_BINARY = "UNHEX(IF({c} = '', REPEAT('0', 32), REPLACE({c}, '-', '')))"
+TO_TEXT = (
+    "IF({c} = UNHEX(REPEAT('0', 32)), '', LOWER(CONCAT("
+    "SUBSTR(HEX({c}), 1, 8), '-', SUBSTR(HEX({c}), 9, 4), '-', SUBSTR(HEX({c}), 13, 4), '-', "
+    "SUBSTR(HEX({c}), 17, 4), '-', SUBSTR(HEX({c}), 21))))"
+)
+
+
+def binary(column):
+    return column + '_bin'
+
+
+def text(column):
+    return column[:-len('_bin')]
+
+
+def index_name(table, columns):
+    return f"ix_{table}_{'_'.join(columns)}"
+
+
+def key_tables(inspector):
+    """(table, string key columns) of the tables holding keys in either form."""
+    for table, columns in KEY_COLUMNS.items():
+        if inspector.has_table(table):
+            names = {column['name'] for column in inspector.get_columns(table)}
+            columns = [column for column in columns if column in names or binary(column) in names]
+            if columns:
+                yield table, columns
+
+
+def binary_indexes(table, columns):
+    """(name, columns, unique) of the indexes the twins get."""
+    indexes = [(f"uq_{table}_id_bin", ['id_bin'], True)] if 'id' in columns else []
+    for names in KEY_INDEXES.get(table, []):
+        names = [binary(name) if name in columns else name for name in names]
+        indexes.append((index_name(table, names), names, False))
+    return indexes
+
+
+#
+# SQLite
+#
+def to_binary(value):
+    if value is None:
+        return None
+    return NIL.bytes if value == '' else uuid.UUID(value).bytes
+
+
+def to_text(value):
+    if value is None:
+        return None
+    return '' if value == NIL.bytes else str(uuid.UUID(bytes=value))
+
+
+def convert_sqlite(table, sources, targets, convert):
+    """Set each of `targets` to `convert` of the matching column of `sources`, row by row."""
+    bind = op.get_bind()
+    select = sa.text(
+        f"SELECT rowid, {', '.join(sources)} FROM {table} WHERE rowid > :last ORDER BY rowid LIMIT {BATCH_SIZE}"
+    )
+    update = sa.text(
+        f"UPDATE {table} SET {', '.join(f'{target} = :{target}' for target in targets)} WHERE rowid = :rowid"
+    )
+
+    last = 0
+    while True:
+        rows = bind.execute(select, {'last': last}).all()
+        if not rows:
+            break
+
+        bind.execute(update, [
+            {'rowid': row[0], **{target: convert(value) for target, value in zip(targets, row[1:])}}
+            for row in rows
+        ])
+        last = rows[-1][0]
+
+
+#
+# MySQL
+#
+def fulltext_tables(inspector, tables):
+    """Names of the `tables` that have a FULLTEXT index (purchase, see ix_purchase_search)."""
+    return {
+        table for table, _ in tables
+        if any(index.get('dialect_options', {}).get('mysql_prefix') == 'FULLTEXT' for index in inspector.get_indexes(table))
+    }
+
+
+def alter(table, clauses, rebuilds, fulltext):
+    """
+    Run ALTER TABLE `table` `clauses` in place. Concurrent writes keep flowing,
+    except while a table with a FULLTEXT index (one of `fulltext`) is rebuilt:
+    InnoDB refuses LOCK=NONE for that (ER 1846), so such tables are only
+    readable for the length of the copy.
+    """
+    lock = 'SHARED' if rebuilds and table in fulltext else 'NONE'
+    op.execute(f"ALTER TABLE {table} {', '.join(clauses)}, ALGORITHM=INPLACE, LOCK={lock}")
+
+
+def create_triggers(table, columns):
+    """Dual-write triggers: a write sets one of the twins, the other follows it."""
+    inserted = " ".join(
+        f"SET NEW.{binary(column)} = IFNULL(NEW.{binary(column)}, {TO_BINARY.format(c='NEW.' + column)}); "
+        f"SET NEW.{column} = IFNULL(NEW.{column}, {TO_TEXT.format(c='NEW.' + binary(column))});"
+        for column in columns
+    )
+    updated = " ".join(
+        f"IF NOT (NEW.{column} <=> OLD.{column}) THEN "
+        f"SET NEW.{binary(column)} = {TO_BINARY.format(c='NEW.' + column)}; "
+        f"ELSEIF NOT (NEW.{binary(column)} <=> OLD.{binary(column)}) THEN "
+        f"SET NEW.{column} = {TO_TEXT.format(c='NEW.' + binary(column))}; END IF;"
+        for column in columns
+    )
+
+    op.execute(f"CREATE TRIGGER {table}__keys_bi BEFORE INSERT ON {table} FOR EACH ROW BEGIN {inserted} END")
+    op.execute(f"CREATE TRIGGER {table}__keys_bu BEFORE UPDATE ON {table} FOR EACH ROW BEGIN {updated} END")
+
+
+def drop_triggers(table):
+    op.execute(f"DROP TRIGGER IF EXISTS {table}__keys_bi")
+    op.execute(f"DROP TRIGGER IF EXISTS {table}__keys_bu")
+
+
+def backfill(table, primary_key, assignments):
+    """Run UPDATE ... SET `assignments` over every row, BATCH_SIZE rows per statement."""
+    bind = op.get_bind()
+    update = f"UPDATE {table} SET {assignments}"
+
+    if len(primary_key) != 1:
+        bind.execute(sa.text(update))
+        return
+
+    key = primary_key[0]
+    after, parameters = "TRUE", {}
+    while True:
+        upper = bind.execute(
+            sa.text(f"SELECT {key} FROM {table} WHERE {after} ORDER BY {key} LIMIT 1 OFFSET {BATCH_SIZE - 1}"),
+            parameters,
+        ).scalar()
+
+        if upper is None:
+            bind.execute(sa.text(f"{update} WHERE {after}"), parameters)
+            return
+
+        bind.execute(sa.text(f"{update} WHERE {after} AND {key} <= :upper"), {**parameters, 'upper': upper})
+        after, parameters = f"{key} > :last", {'last': upper}
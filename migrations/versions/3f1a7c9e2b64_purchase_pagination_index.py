@@ -0,0 +1,26 @@
+"""purchase pagination index
+
+Revision ID: 3f1a7c9e2b64
+Revises: 5c91d002eca9
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a7c9e2b64'
+down_revision = '5c91d002eca9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('purchase', schema=None) as batch_op:
+        batch_op.create_index('ix_purchase_purchase_date_id', ['purchase_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('purchase', schema=None) as batch_op:
+        batch_op.drop_index('ix_purchase_purchase_date_id')
@@ -0,0 +1,258 @@
+"""drop string uuid keys
+
+Contract step after 7c3e9a1f5b20: the BINARY(16) twins become the
+primary and foreign keys and the 36 character string columns go. Only
+the release using CompactUUID may be running by now, so on MySQL this
+revision refuses to run unless asked to with
+
+    flask db upgrade -x contract=true
+
+The steps keep that release working throughout: the foreign keys over
+the string columns are dropped, each table switches its primary key to
+the twins online, the dual-write triggers and the string columns go, and
+the foreign keys are added back over the twins without validation (the
+triggers kept the twins in step with the validated strings).
+
+Statements rebuilding purchase, which has a FULLTEXT index, take
+LOCK=SHARED instead of LOCK=NONE (see 7c3e9a1f5b20).
+
+SQLite (development) rebuilds each table with the twins as its keys,
+keeping rowids so the purchase_fts index still lines up.
+
+The helpers shared with 7c3e9a1f5b20 live in migrations/uuid_keys.py.
+
+Revision ID: 4e8b2d6f1a97
+Revises: 7c3e9a1f5b20
+Create Date: 2026-10-19 10:14:05.218734
+
+"""
+import importlib.util
+import os
+import sys
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8b2d6f1a97'
+down_revision = '7c3e9a1f5b20'
+branch_labels = None
+depends_on = None
+
+
+def _load_uuid_keys():
+    if 'uuid_keys' not in sys.modules:
+        path = os.path.join(os.path.dirname(__file__), os.pardir, 'uuid_keys.py')
+        spec = importlib.util.spec_from_file_location('uuid_keys', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['uuid_keys'] = module
+    return sys.modules['uuid_keys']
+
+
+uuid_keys = _load_uuid_keys()
+binary, text, index_name = uuid_keys.binary, uuid_keys.text, uuid_keys.index_name
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = list(uuid_keys.key_tables(sa.inspect(bind)))
+
+    if bind.dialect.name != 'mysql':
+        for table, columns in tables:
+            _rebuild_sqlite(table, columns, binary_keys=True)
+        return
+
+    if context.get_x_argument(as_dictionary=True).get('contract') != 'true':
+        raise RuntimeError(
+            "4e8b2d6f1a97 drops the string key columns the previous release still writes. Run "
+            "'flask db upgrade -x contract=true' once only the release using CompactUUID is running."
+        )
+
+    inspector = sa.inspect(bind)
+    schema = {table: _describe(inspector, table) for table, _ in tables}
+    fulltext = uuid_keys.fulltext_tables(inspector, tables)
+
+    with op.get_context().autocommit_block():
+        # They would keep the primary keys from changing
+        for table, columns in tables:
+            _drop_foreign_keys(table, schema[table]['foreign_keys'])
+
+        for table, columns in tables:
+            nullable = schema[table]['nullable']
+            clauses = _primary_key_clauses(schema[table]['primary_key'], columns, binary)
+            clauses += [f"MODIFY {column} VARCHAR(36) NULL" for column in columns]
+            clauses += [f"MODIFY {binary(column)} BINARY(16) NOT NULL" for column in columns if not nullable[column]]
+            if 'id' in columns:
+                # The primary key covers it now
+                clauses.append(f"DROP INDEX uq_{table}_id_bin")
+            uuid_keys.alter(table, clauses, rebuilds=True, fulltext=fulltext)
+
+        for table, columns in tables:
+            uuid_keys.drop_triggers(table)
+            clauses = [f"DROP INDEX {index_name(table, names)}" for names in uuid_keys.KEY_INDEXES.get(table, [])]
+            clauses += [f"DROP COLUMN {column}" for column in columns]
+            uuid_keys.alter(table, clauses, rebuilds=True, fulltext=fulltext)
+
+        _add_foreign_keys(schema, binary)
+
+
+def downgrade():
+    bind = op.get_bind()
+    tables = list(uuid_keys.key_tables(sa.inspect(bind)))
+
+    if bind.dialect.name != 'mysql':
+        for table, columns in tables:
+            for column in columns:
+                op.add_column(table, sa.Column(column, sa.String(36), nullable=True))
+            uuid_keys.convert_sqlite(table, [binary(column) for column in columns], columns, uuid_keys.to_text)
+            _rebuild_sqlite(table, columns, binary_keys=False)
+        return
+
+    inspector = sa.inspect(bind)
+    schema = {table: _describe(inspector, table) for table, _ in tables}
+    fulltext = uuid_keys.fulltext_tables(inspector, tables)
+
+    with op.get_context().autocommit_block():
+        for table, columns in tables:
+            uuid_keys.alter(table, [
+                f"ADD COLUMN {column} VARCHAR(36) NULL" for column in columns
+            ], rebuilds=True, fulltext=fulltext)
+            uuid_keys.create_triggers(table, columns)
+
+        for table, columns in tables:
+            uuid_keys.backfill(table, schema[table]['primary_key'], ", ".join(
+                f"{column} = {uuid_keys.TO_TEXT.format(c=binary(column))}" for column in columns
+            ))
+
+        for table, columns in tables:
+            _drop_foreign_keys(table, schema[table]['foreign_keys'])
+
+        for table, columns in tables:
+            nullable = schema[table]['nullable']
+            binaries = [binary(column) for column in columns]
+            clauses = _primary_key_clauses(schema[table]['primary_key'], binaries, text)
+            clauses += [f"MODIFY {column} VARCHAR(36) NOT NULL" for column in columns if not nullable[binary(column)]]
+            clauses += [f"MODIFY {column} BINARY(16) NULL" for column in binaries]
+            if 'id' in columns:
+                clauses.append(f"ADD UNIQUE INDEX uq_{table}_id_bin (id_bin)")
+            clauses += [
+                f"ADD INDEX {index_name(table, names)} ({', '.join(names)})" for names in uuid_keys.KEY_INDEXES.get(table, [])
+            ]
+            uuid_keys.alter(table, clauses, rebuilds=True, fulltext=fulltext)
+
+        _add_foreign_keys(schema, text)
+
+
+def _describe(inspector, table):
+    return {
+        'primary_key': inspector.get_pk_constraint(table)['constrained_columns'],
+        'foreign_keys': inspector.get_foreign_keys(table),
+        'nullable': {column['name']: column['nullable'] for column in inspector.get_columns(table)},
+    }
+
+
+#
+# SQLite
+#
+def _rebuild_sqlite(table, columns, binary_keys):
+    """
+    Copy `table` into one keyed by the binary twins of `columns`, without the
+    string columns, or (binary_keys=False) keyed by the string columns again
+    with the twins as plain columns, the way 7c3e9a1f5b20 left them.
+    """
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Current key column -> the column taking its place
+    if binary_keys:
+        twins = {column: binary(column) for column in columns}
+    else:
+        twins = {binary(column): column for column in columns}
+    replaced = {new: old for old, new in twins.items()}
+    rename = binary if binary_keys else text
+
+    reflected = inspector.get_columns(table)
+    nullable = {column['name']: column['nullable'] for column in reflected}
+    metadata = sa.MetaData()
+    copy = sa.Table(table + '__new', metadata)
+
+    for column in reflected:
+        name, kind, default = column['name'], column['type'], column.get('default')
+        if name in replaced:
+            kind, optional = (sa.BINARY(16) if binary_keys else sa.String(36)), nullable[replaced[name]]
+        elif name in twins:
+            if binary_keys:
+                continue
+            kind, optional = sa.BINARY(16), True
+        else:
+            optional = column['nullable']
+        copy.append_column(sa.Column(name, kind, nullable=optional, server_default=sa.text(default) if default else None))
+
+    copy.append_constraint(sa.PrimaryKeyConstraint(
+        *[twins.get(name, name) for name in inspector.get_pk_constraint(table)['constrained_columns']]
+    ))
+    for foreign_key in inspector.get_foreign_keys(table):
+        referred = foreign_key['referred_table']
+        referred_columns = [rename(name) for name in foreign_key['referred_columns']]
+        # Only there so the constraint resolves; the real table is rebuilt the same way
+        sa.Table(referred, metadata, *[sa.Column(name, sa.BINARY(16)) for name in referred_columns], extend_existing=True)
+        copy.append_constraint(sa.ForeignKeyConstraint(
+            [twins.get(name, name) for name in foreign_key['constrained_columns']],
+            [f"{referred}.{name}" for name in referred_columns],
+            name=foreign_key['name'],
+        ))
+    for unique in inspector.get_unique_constraints(table):
+        copy.append_constraint(sa.UniqueConstraint(*[twins.get(name, name) for name in unique['column_names']], name=unique['name']))
+    for check in inspector.get_check_constraints(table):
+        copy.append_constraint(sa.CheckConstraint(sa.text(check['sqltext']), name=check['name']))
+
+    indexes = inspector.get_indexes(table)
+    # Dropping the table drops its triggers, e.g. the ones feeding purchase_fts
+    triggers = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {'table': table}
+    ).scalars().all()
+
+    copy.create(bind)
+    names = ', '.join(column.name for column in copy.columns)
+    bind.execute(sa.text(f"INSERT INTO {copy.name} (rowid, {names}) SELECT rowid, {names} FROM {table}"))
+    bind.execute(sa.text(f"DROP TABLE {table}"))
+    bind.execute(sa.text(f"ALTER TABLE {copy.name} RENAME TO {table}"))
+
+    for index in indexes:
+        names = [twins.get(name, name) for name in index['column_names']]
+        name = index['name'] if names == index['column_names'] else index_name(table, names)
+        op.create_index(name, table, names, unique=bool(index['unique']))
+    for trigger in triggers:
+        bind.execute(sa.text(trigger))
+
+
+#
+# MySQL
+#
+def _primary_key_clauses(primary_key, keys, rename):
+    if not any(name in keys for name in primary_key):
+        return []
+    return ["DROP PRIMARY KEY", f"ADD PRIMARY KEY ({', '.join(rename(name) if name in keys else name for name in primary_key)})"]
+
+
+def _drop_foreign_keys(table, foreign_keys):
+    if foreign_keys:
+        uuid_keys.alter(table, [
+            f"DROP FOREIGN KEY {foreign_key['name']}" for foreign_key in foreign_keys
+        ], rebuilds=False, fulltext=())
+
+
+def _add_foreign_keys(schema, rename):
+    """Add the foreign keys of `schema` back over the columns `rename` gives, under their old names."""
+    op.execute("SET foreign_key_checks = 0")
+    for table, description in schema.items():
+        for foreign_key in description['foreign_keys']:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key['name']} "
+                f"FOREIGN KEY ({', '.join(rename(name) for name in foreign_key['constrained_columns'])}) "
+                f"REFERENCES {foreign_key['referred_table']} "
+                f"({', '.join(rename(name) for name in foreign_key['referred_columns'])}), "
+                f"ALGORITHM=INPLACE, LOCK=NONE"
+            )
+    op.execute("SET foreign_key_checks = 1")
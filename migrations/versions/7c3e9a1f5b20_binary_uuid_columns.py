@@ -0,0 +1,122 @@
+"""binary uuid columns
+
+Expand step of storing UUID keys as BINARY(16) instead of 36 character
+strings: every key column, and every column referring to one, gets a
+BINARY(16) twin named <column>_bin, which the release using CompactUUID
+reads and writes. The string columns stay the primary and foreign keys,
+so the previous release keeps working against this schema until revision
+4e8b2d6f1a97 drops them:
+
+1. flask db upgrade 7c3e9a1f5b20, while the previous release runs
+2. roll out the release using CompactUUID
+3. flask db upgrade -x contract=true, once no previous release is left
+
+On MySQL the columns are added online. BEFORE INSERT and BEFORE UPDATE
+triggers fill in whichever twin a write leaves out, so rows written by
+either release carry both forms; NOT NULL is checked after BEFORE
+triggers (MySQL 5.7+), so the new release can leave out the string
+columns it no longer knows about. Existing rows are then backfilled in
+primary key order, BATCH_SIZE rows per statement, and the twins get the
+indexes the new release looks rows up by.
+
+Adding and dropping columns rebuilds the table; InnoDB can't do that with
+LOCK=NONE on a table with a FULLTEXT index (purchase), which stays
+readable but not writable while it is rebuilt.
+
+SQLite (development) has no rolling deploys: the columns are added and
+backfilled here and 4e8b2d6f1a97 rebuilds the tables around them.
+
+The helpers live in migrations/uuid_keys.py, shared with 4e8b2d6f1a97.
+
+Revision ID: 7c3e9a1f5b20
+Revises: b25d7e9a4c81
+Create Date: 2026-10-18 19:02:47.530116
+
+"""
+import importlib.util
+import os
+import sys
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a1f5b20'
+down_revision = 'b25d7e9a4c81'
+branch_labels = None
+depends_on = None
+
+
+def _load_uuid_keys():
+    if 'uuid_keys' not in sys.modules:
+        path = os.path.join(os.path.dirname(__file__), os.pardir, 'uuid_keys.py')
+        spec = importlib.util.spec_from_file_location('uuid_keys', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['uuid_keys'] = module
+    return sys.modules['uuid_keys']
+
+
+uuid_keys = _load_uuid_keys()
+binary = uuid_keys.binary
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = list(uuid_keys.key_tables(inspector))
+
+    if bind.dialect.name != 'mysql':
+        for table, columns in tables:
+            for column in columns:
+                op.add_column(table, sa.Column(binary(column), sa.BINARY(16), nullable=True))
+            uuid_keys.convert_sqlite(table, columns, [binary(column) for column in columns], uuid_keys.to_binary)
+        return
+
+    primary_keys = {table: inspector.get_pk_constraint(table)['constrained_columns'] for table, _ in tables}
+    fulltext = uuid_keys.fulltext_tables(inspector, tables)
+
+    with op.get_context().autocommit_block():
+        for table, columns in tables:
+            uuid_keys.alter(table, [
+                f"ADD COLUMN {binary(column)} BINARY(16) NULL AFTER {column}" for column in columns
+            ], rebuilds=True, fulltext=fulltext)
+            uuid_keys.create_triggers(table, columns)
+
+        # Rows written from here on already carry both forms; rewriting them is harmless
+        for table, columns in tables:
+            uuid_keys.backfill(table, primary_keys[table], ", ".join(
+                f"{binary(column)} = {uuid_keys.TO_BINARY.format(c=column)}" for column in columns
+            ))
+
+        for table, columns in tables:
+            indexes = uuid_keys.binary_indexes(table, columns)
+            if indexes:
+                uuid_keys.alter(table, [
+                    f"ADD {'UNIQUE ' if unique else ''}INDEX {name} ({', '.join(names)})"
+                    for name, names, unique in indexes
+                ], rebuilds=False, fulltext=fulltext)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = list(uuid_keys.key_tables(inspector))
+
+    if bind.dialect.name != 'mysql':
+        for table, columns in tables:
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} DROP COLUMN {binary(column)}")
+        return
+
+    fulltext = uuid_keys.fulltext_tables(inspector, tables)
+
+    with op.get_context().autocommit_block():
+        for table, columns in tables:
+            uuid_keys.drop_triggers(table)
+            uuid_keys.alter(table, [
+                f"DROP INDEX {name}" for name, _, _ in uuid_keys.binary_indexes(table, columns)
+            ] + [
+                f"DROP COLUMN {binary(column)}" for column in columns
+            ], rebuilds=True, fulltext=fulltext)
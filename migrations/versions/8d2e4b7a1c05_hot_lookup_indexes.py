@@ -0,0 +1,45 @@
+"""hot lookup indexes
+
+Revision ID: 8d2e4b7a1c05
+Revises: 3f1a7c9e2b64
+Create Date: 2026-10-18 10:04:17.228941
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b7a1c05'
+down_revision = '3f1a7c9e2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agent', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agent_distributor_id'), ['distributor_id'], unique=False)
+
+    # purchase_date lookups are served by ix_purchase_purchase_date_id
+    with op.batch_alter_table('purchase', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_purchase_agent_id'), ['agent_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_purchase_distributor_id'), ['distributor_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_purchase_purchase_status'), ['purchase_status'], unique=False)
+
+    with op.batch_alter_table('approval_request', schema=None) as batch_op:
+        batch_op.create_index('ix_approval_request_distributor_id_status', ['distributor_id', 'status'], unique=False)
+        batch_op.create_index('ix_approval_request_agent_id_distributor_id_status', ['agent_id', 'distributor_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('approval_request', schema=None) as batch_op:
+        batch_op.drop_index('ix_approval_request_agent_id_distributor_id_status')
+        batch_op.drop_index('ix_approval_request_distributor_id_status')
+
+    with op.batch_alter_table('purchase', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_purchase_purchase_status'))
+        batch_op.drop_index(batch_op.f('ix_purchase_distributor_id'))
+        batch_op.drop_index(batch_op.f('ix_purchase_agent_id'))
+
+    with op.batch_alter_table('agent', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agent_distributor_id'))
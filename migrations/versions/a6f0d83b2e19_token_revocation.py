@@ -0,0 +1,43 @@
+"""token revocation
+
+Revision ID: a6f0d83b2e19
+Revises: e91c3d5f7a28
+Create Date: 2026-10-18 15:22:47.901364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6f0d83b2e19'
+down_revision = 'e91c3d5f7a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revocation',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('jti', sa.String(length=36), nullable=True),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('revoked_before', sa.DateTime(), nullable=True),
+    sa.Column('expires', sa.DateTime(), nullable=False),
+    sa.Column('created', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('token_revocation', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_revocation_created'), ['created'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_revocation_email'), ['email'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_revocation_expires'), ['expires'], unique=False)
+        batch_op.create_index(batch_op.f('ix_token_revocation_jti'), ['jti'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_revocation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_revocation_jti'))
+        batch_op.drop_index(batch_op.f('ix_token_revocation_expires'))
+        batch_op.drop_index(batch_op.f('ix_token_revocation_email'))
+        batch_op.drop_index(batch_op.f('ix_token_revocation_created'))
+
+    op.drop_table('token_revocation')
@@ -0,0 +1,44 @@
+"""account directory
+
+Revision ID: b25d7e9a4c81
+Revises: f3b8e21c6d47
+Create Date: 2026-10-18 17:31:56.204418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b25d7e9a4c81'
+down_revision = 'f3b8e21c6d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account_directory',
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('account_type', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.String(length=36), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+    with op.batch_alter_table('account_directory', schema=None) as batch_op:
+        batch_op.create_index('ix_account_directory_account_type_account_id', ['account_type', 'account_id'], unique=False)
+
+    # Backfill from the account tables. Should an email be registered in more
+    # than one of them, the first table listed here keeps it.
+    for account_type, table in ((1, 'agent'), (2, 'distributor'), (3, 'insurance_company')):
+        op.execute(
+            f"INSERT INTO account_directory (email, account_type, account_id) "
+            f"SELECT lower(email), {account_type}, min(id) FROM {table} "
+            f"WHERE lower(email) NOT IN (SELECT email FROM account_directory) "
+            f"GROUP BY lower(email)"
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('account_directory', schema=None) as batch_op:
+        batch_op.drop_index('ix_account_directory_account_type_account_id')
+
+    op.drop_table('account_directory')
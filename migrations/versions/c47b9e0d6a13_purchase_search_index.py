@@ -0,0 +1,61 @@
+"""purchase search index
+
+Revision ID: c47b9e0d6a13
+Revises: 8d2e4b7a1c05
+Create Date: 2026-10-18 11:26:52.874130
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47b9e0d6a13'
+down_revision = '8d2e4b7a1c05'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ['firstname', 'lastname', 'email', 'phone_number', 'product', 'product_category']
+
+_columns = ', '.join(COLUMNS)
+_new = ', '.join('new.' + column for column in COLUMNS)
+_old = ', '.join('old.' + column for column in COLUMNS)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'mysql':
+        op.create_index('ix_purchase_search', 'purchase', COLUMNS, unique=False, mysql_prefix='FULLTEXT')
+
+    elif dialect == 'sqlite':
+        op.execute(f"CREATE VIRTUAL TABLE purchase_fts USING fts5({_columns}, content='purchase', content_rowid='rowid')")
+        op.execute(
+            f"CREATE TRIGGER purchase_fts_ai AFTER INSERT ON purchase BEGIN "
+            f"INSERT INTO purchase_fts(rowid, {_columns}) VALUES (new.rowid, {_new}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER purchase_fts_ad AFTER DELETE ON purchase BEGIN "
+            f"INSERT INTO purchase_fts(purchase_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER purchase_fts_au AFTER UPDATE OF {_columns} ON purchase BEGIN "
+            f"INSERT INTO purchase_fts(purchase_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old}); "
+            f"INSERT INTO purchase_fts(rowid, {_columns}) VALUES (new.rowid, {_new}); END"
+        )
+        # Index the purchases that already exist
+        op.execute("INSERT INTO purchase_fts(purchase_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'mysql':
+        op.drop_index('ix_purchase_search', table_name='purchase')
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS purchase_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS purchase_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS purchase_fts_ai")
+        op.execute("DROP TABLE IF EXISTS purchase_fts")
@@ -0,0 +1,41 @@
+"""sales rollup
+
+Revision ID: e91c3d5f7a28
+Revises: c47b9e0d6a13
+Create Date: 2026-10-18 12:41:09.316582
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91c3d5f7a28'
+down_revision = 'c47b9e0d6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sales_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('agent_id', sa.String(length=36), nullable=False),
+    sa.Column('distributor_id', sa.String(length=36), nullable=False),
+    sa.Column('product_category', sa.String(length=120), nullable=False),
+    sa.Column('purchase_status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'agent_id', 'distributor_id', 'product_category', 'purchase_status')
+    )
+
+    # Backfill from the purchases that already exist
+    op.execute(
+        "INSERT INTO sales_rollup (day, agent_id, distributor_id, product_category, purchase_status, count) "
+        "SELECT date(purchase_date), agent_id, coalesce(distributor_id, ''), product_category, "
+        "coalesce(purchase_status, 'pending'), count(*) FROM purchase "
+        "GROUP BY date(purchase_date), agent_id, coalesce(distributor_id, ''), product_category, "
+        "coalesce(purchase_status, 'pending')"
+    )
+
+
+def downgrade():
+    op.drop_table('sales_rollup')
@@ -0,0 +1,31 @@
+"""one time password
+
+Revision ID: f3b8e21c6d47
+Revises: a6f0d83b2e19
+Create Date: 2026-10-18 16:08:13.552710
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8e21c6d47'
+down_revision = 'a6f0d83b2e19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('one_time_password',
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('code_hash', sa.String(length=64), nullable=False),
+    sa.Column('expires', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+
+
+def downgrade():
+    op.drop_table('one_time_password')
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+os.environ.setdefault('JWT_SECRET', 'test-secret')
+
+from config import Config
+from app import create_app, db
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ECHO = False
+    DB_REPLICA_URIS = []
+
+
+@pytest.fixture
+def app():
+    application = create_app(TestConfig)
+    with application.app_context():
+        db.create_all()
+        yield application
+        db.session.remove()
+        db.drop_all()
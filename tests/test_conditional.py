@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import Distributor
+
+
+def distributor(updated):
+    row = Distributor(business_name='Biz', representative_name='Rep', email='d@example.com', password='x', updated=updated)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def get_distributor(app, id, headers=()):
+    access_token = create_access_token({"email": 'root@example.com', "role": 'admin'})
+    return app.test_client().get(
+        f'/api/distributors/{id}', headers={'Authorization': 'Bearer ' + access_token, **dict(headers)}
+    )
+
+
+def test_echoed_last_modified_is_not_modified(app):
+    id = distributor(datetime(2024, 5, 17, 10, 30, 15, 250000))
+
+    response = get_distributor(app, id)
+    assert response.status_code == 200
+    assert response.headers['Last-Modified'] == 'Fri, 17 May 2024 10:30:15 GMT'
+
+    response = get_distributor(app, id, {'If-Modified-Since': response.headers['Last-Modified']})
+    assert response.status_code == 304
+
+
+def test_last_modified_waits_for_its_second_to_end(app):
+    id = distributor(datetime.utcnow())
+
+    response = get_distributor(app, id)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response.headers
+    assert response.headers['ETag']
+
+
+@pytest.mark.parametrize('since, status', [
+    ('Fri, 17 May 2024 10:30:14 GMT', 200),
+    ('Fri, 17 May 2024 10:30:16 GMT', 304),
+])
+def test_if_modified_since(app, since, status):
+    id = distributor(datetime(2024, 5, 17, 10, 30, 15))
+    assert get_distributor(app, id, {'If-Modified-Since': since}).status_code == status
@@ -0,0 +1,38 @@
+import time
+
+from flask_jwt_extended import create_access_token, decode_token
+
+
+def token():
+    return create_access_token({"email": "root@example.com", "role": "admin"})
+
+
+def get_cache_stats(client, access_token):
+    return client.get('/api/admin/cache', headers={'Authorization': 'Bearer ' + access_token})
+
+
+def test_login_in_the_second_of_logout_all_stays_valid(app):
+    client = app.test_client()
+    # Start at the beginning of a second, so every token below has the same iat
+    time.sleep(1 - time.time() % 1)
+
+    earlier = token()
+    current = token()
+    response = client.post('/api/auth/logout-all', headers={'Authorization': 'Bearer ' + current})
+    assert response.status_code == 200
+    again = token()
+
+    assert len({decode_token(t, allow_expired=True)['iat'] for t in (earlier, current, again)}) == 1
+    assert get_cache_stats(client, current).status_code == 401
+    assert get_cache_stats(client, again).status_code == 200
+
+
+def test_logout_all_revokes_tokens_of_earlier_seconds(app):
+    client = app.test_client()
+    earlier = token()
+    time.sleep(1 - time.time() % 1)
+
+    current = token()
+    assert client.post('/api/auth/logout-all', headers={'Authorization': 'Bearer ' + current}).status_code == 200
+
+    assert get_cache_stats(client, earlier).status_code == 401
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import Agent, Distributor, Purchase, SalesRollup
+
+
+@pytest.fixture
+def network(app):
+    distributor = Distributor(business_name='Biz', representative_name='Rep', email='d@example.com', password='x')
+    other = Distributor(business_name='Other', representative_name='Rep', email='o@example.com', password='x')
+    agent = Agent(firstname='Ann', lastname='Lee', email='a@example.com', password='x', distributor=distributor)
+    db.session.add_all([distributor, other, agent])
+    db.session.flush()
+    purchases = [
+        Purchase(
+            firstname='Buyer', lastname='One', email=f'buyer{number}@example.com', product_category='phone',
+            product='P1', phone_number='08012345678', purchase_secret=f'SECRET{number:02}', agent=agent,
+            distributor_id=distributor.id, purchase_date=datetime(2024, 5, 17),
+        )
+        for number in range(3)
+    ]
+    db.session.add_all(purchases)
+    db.session.commit()
+    return distributor, other, purchases
+
+
+def rollups():
+    return [(row.purchase_status, row.count) for row in SalesRollup.query.order_by(SalesRollup.purchase_status)]
+
+
+def test_emptied_rollup_rows_are_deleted(network):
+    _, _, purchases = network
+    assert rollups() == [('pending', 3)]
+
+    for purchase in purchases:
+        purchase.purchase_status = 'approved'
+    db.session.commit()
+    assert rollups() == [('approved', 3)]
+
+    for purchase in purchases:
+        db.session.delete(purchase)
+    db.session.commit()
+    assert rollups() == []
+
+
+def get_stats(app, role, email, distributor_id):
+    headers = {}
+    if role is not None:
+        headers['Authorization'] = 'Bearer ' + create_access_token({"email": email, "role": role})
+    return app.test_client().get(
+        f'/api/purchase/stats?group_by=distributor_id&distributor_id={distributor_id}', headers=headers
+    )
+
+
+@pytest.mark.parametrize('role, email, status, count', [
+    (None, None, 401, None),
+    (1, 'a@example.com', 403, None),
+    ('admin', 'root@example.com', 200, 3),
+    (2, 'd@example.com', 200, 3),
+    # Another distributor asking for this network only sees its own
+    ('distributor', 'o@example.com', 200, None),
+])
+def test_stats_need_a_distributor_or_admin_token(app, network, role, email, status, count):
+    distributor, _, _ = network
+    response = get_stats(app, role, email, distributor.id)
+
+    assert response.status_code == status
+    if status == 200:
+        expected = [{'distributor_id': distributor.id, 'count': count}] if count else []
+        assert response.json['data'] == expected
@@ -0,0 +1,108 @@
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from marshmallow import Schema, fields
+
+from app.extensions import db
+from app.ids import new_id
+from app.models import Agent, Distributor, Purchase
+from app.schemas import AgentSchema, DistributorSchema, PurchaseSchema
+from app.serializers import compile_schema, compiled_dump
+
+
+def assert_same_dump(schema, obj, many=None):
+    dump = compile_schema(schema)
+    # Otherwise the comparison below would be trivially true
+    assert dump != schema.dump, "schema was not compiled"
+
+    expected = schema.dump(obj, many=many)
+    actual = dump(obj, many=many)
+    # Same keys in the same order, same values: byte-identical JSON
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+@pytest.fixture
+def rows(app):
+    distributor = Distributor(id=new_id(), business_name='Biz', representative_name='Rep', email='d@example.com', password='x')
+    lonely = Distributor(id=new_id(), business_name='Empty', representative_name='Rep', email='e@example.com', password='x')
+    agent = Agent(id=new_id(), firstname='Ann', lastname='Lee', email='a@example.com', password='x', distributor=distributor)
+    free_agent = Agent(id=new_id(), firstname='Bo', lastname='Free', email='b@example.com', password='x')
+    purchase = Purchase(
+        id=new_id(), firstname='Buyer', lastname='One', email='buyer@example.com', product_category='phone',
+        product='P1', phone_number='08012345678', purchase_secret='SECRET01', agent=agent,
+        purchase_date=datetime(2024, 5, 17, 9, 30, 15, 250000),
+    )
+    db.session.add_all([distributor, lonely, agent, free_agent, purchase])
+    db.session.commit()
+    return SimpleNamespace(
+        distributor=distributor, lonely=lonely, agent=agent, free_agent=free_agent, purchase=purchase,
+    )
+
+
+def test_purchase_matches_marshmallow(rows):
+    assert_same_dump(PurchaseSchema(), rows.purchase)
+    assert_same_dump(PurchaseSchema(many=True), Purchase.query.all())
+
+
+def test_purchase_without_agent(app):
+    # Not yet flushed: the nested agent is None
+    purchase = Purchase(id=new_id(), firstname='No', lastname='Agent', email='n@example.com', product_category='phone',
+                        product='P2', phone_number='08012345678', purchase_secret='SECRET02')
+    assert purchase.agent is None
+    assert_same_dump(PurchaseSchema(), purchase)
+
+
+def test_agent_matches_marshmallow(rows):
+    assert_same_dump(AgentSchema(), rows.agent)
+    # No distributor: nested None
+    assert_same_dump(AgentSchema(), rows.free_agent)
+    assert_same_dump(AgentSchema(many=True), Agent.query.all())
+
+
+def test_distributor_matches_marshmallow(rows):
+    assert_same_dump(DistributorSchema(), rows.distributor)
+    # No agents: empty nested collection
+    assert rows.lonely.agents == []
+    assert_same_dump(DistributorSchema(), rows.lonely)
+    assert_same_dump(DistributorSchema(many=True), Distributor.query.all())
+
+
+def test_empty_list(rows):
+    assert_same_dump(PurchaseSchema(many=True), [])
+
+
+@pytest.mark.parametrize('schema_class, only', [
+    (PurchaseSchema, ('id', 'purchase_date')),
+    (PurchaseSchema, ('id', 'agent')),
+    (AgentSchema, ('email', 'distributor')),
+    (DistributorSchema, ('business_name', 'agents')),
+])
+def test_fieldsets_match_marshmallow(rows, schema_class, only):
+    model = schema_class.Meta.model
+    expected = schema_class(many=True, only=only).dump(model.query.all())
+    actual = compiled_dump(schema_class, only)(model.query.all())
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+class DatesSchema(Schema):
+    day = fields.Date()
+    at = fields.DateTime()
+    formatted = fields.DateTime(format='%d/%m/%Y')
+
+
+@pytest.mark.parametrize('day, at', [
+    (date(2024, 2, 29), datetime(2024, 2, 29, 23, 59, 59, 999999)),
+    (date(2024, 1, 1), datetime(2024, 1, 1)),
+    (None, None),
+])
+def test_dates_match_marshmallow(app, day, at):
+    obj = SimpleNamespace(day=day, at=at, formatted=at)
+    assert_same_dump(DatesSchema(), obj)
+
+
+def test_datetime_passed_for_date(app):
+    # A datetime in a Date field goes through the field's own conversion
+    obj = SimpleNamespace(day=datetime(2024, 3, 1, 12, 0), at=datetime(2024, 3, 1, 12, 0), formatted=None)
+    assert_same_dump(DatesSchema(), obj)